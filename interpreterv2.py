@@ -1,17 +1,1001 @@
 from intbase import InterpreterBase, ErrorType
 from brewparse import parse_program
+from element import Element
+from collections import OrderedDict
+import operator
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None # loop kernels then run as plain python functions
 # from debug_utils import debug_logger, debug_logger_with_return_val, debug, info
 
+# Each function is compiled once into a flat list of (opcode, operand) pairs.
+# Every instruction takes two entries in the list so jump targets are plain indices.
+LOAD_CONST = 0
+LOAD_VAR = 1
+LOAD_VAR_CHECKED = 2
+STORE_VAR = 3
+DEFINE_VAR = 4
+CHECK_VAR = 5
+JUMP = 6
+JUMP_IF_FALSE = 7
+CALL = 8
+RETURN = 9
+POP = 10
+PRINT = 11
+INPUTI = 12
+INPUTS = 13
+NEG = 14
+NOT = 15
+ERROR = 16
+JUMP_IF_TRUE = 17
+# conditional jumps for conditions that can only produce a bool, so no type check
+BRANCH_IF_FALSE = 18
+BRANCH_IF_TRUE = 19
+RUN_KERNEL = 20
+# a call whose result is returned right away; runs the callee in place of the caller
+TAIL_CALL = 21
+# loop invariant expressions are evaluated once before the loop into a spare slot; an
+# error while doing so is swallowed and the loop evaluates the expression in place
+HOIST_BEGIN = 22
+HOIST_END = 23
+LOAD_HOISTED = 24
+# && and || whose right side can neither fail nor have side effects; the left operand is
+# left on the stack and the right side skipped when it decides the result
+AND_JUMP = 25
+OR_JUMP = 26
+# binary operators are kept contiguous and last so the dispatch loop can range-check them
+ADD = 27
+SUB = 28
+MUL = 29
+DIV = 30
+EQ = 31
+NE = 32
+LT = 33
+LE = 34
+GT = 35
+GE = 36
+AND = 37
+OR = 38
+# a generic binary operator is rewritten in place to one of these once it has seen its
+# operand types; they only check a type guard and fall back to the generic op on a miss
+ADD_II = 39
+SUB_II = 40
+MUL_II = 41
+DIV_II = 42
+EQ_II = 43
+NE_II = 44
+LT_II = 45
+LE_II = 46
+GT_II = 47
+GE_II = 48
+ADD_SS = 49
+EQ_SS = 50
+NE_SS = 51
+AND_BB = 52
+OR_BB = 53
+
+BINARY_OPCODES = {
+    "+": ADD,
+    "-": SUB,
+    "*": MUL,
+    "/": DIV,
+    "==": EQ,
+    "!=": NE,
+    "<": LT,
+    "<=": LE,
+    ">": GT,
+    ">=": GE,
+    "&&": AND,
+    "||": OR,
+}
+
+# (generic opcode, operand type) -> (specialized opcode, implementation)
+SPECIALIZATIONS = {
+    (ADD, int): (ADD_II, operator.add),
+    (SUB, int): (SUB_II, operator.sub),
+    (MUL, int): (MUL_II, operator.mul),
+    (DIV, int): (DIV_II, operator.floordiv),
+    (EQ, int): (EQ_II, operator.eq),
+    (NE, int): (NE_II, operator.ne),
+    (LT, int): (LT_II, operator.lt),
+    (LE, int): (LE_II, operator.le),
+    (GT, int): (GT_II, operator.gt),
+    (GE, int): (GE_II, operator.ge),
+    (ADD, str): (ADD_SS, operator.add),
+    (EQ, str): (EQ_SS, operator.eq),
+    (NE, str): (NE_SS, operator.ne),
+    (AND, bool): (AND_BB, operator.and_),
+    (OR, bool): (OR_BB, operator.or_),
+}
+
+# when the compiler can prove both operand types it emits the specialized opcode plus
+# this offset, which runs the implementation without any guard
+UNGUARDED_OFFSET = OR_BB + 1 - ADD_II
+FIRST_UNGUARDED = ADD_II + UNGUARDED_OFFSET
+
+# lookup lists for the dispatch loop, indexed by specialized opcode
+GENERIC_OPS = [None] * (OR_BB + 1)
+OPERAND_TYPES = [None] * (OR_BB + 1)
+SPECIALIZED_IMPLS = [None] * (OR_BB + 1 + UNGUARDED_OFFSET)
+for (generic_op, operand_type), (specialized_op, impl) in SPECIALIZATIONS.items():
+    GENERIC_OPS[specialized_op] = generic_op
+    OPERAND_TYPES[specialized_op] = operand_type
+    SPECIALIZED_IMPLS[specialized_op] = impl
+    SPECIALIZED_IMPLS[specialized_op + UNGUARDED_OFFSET] = impl
+
+# marks a frame slot whose variable has not been defined yet
+UNDEFINED = object()
+
+LITERAL_NODES = {"int", "string", "bool", "nil"}
+
+# expressions that always evaluate to a bool when they do not raise an error
+BOOL_NODES = {"bool", "!", "==", "!=", "<", "<=", ">", ">=", "&&", "||"}
+
+# operators whose result type is fixed whenever they do not raise an error
+RESULT_TYPES = {
+    "neg": int,
+    "-": int,
+    "*": int,
+    "/": int,
+    "!": bool,
+    "==": bool,
+    "!=": bool,
+    "<": bool,
+    "<=": bool,
+    ">": bool,
+    ">=": bool,
+    "&&": bool,
+    "||": bool,
+}
+
+# small int tag of every kind of node inside a function body; the compiler's dispatch
+# tables are lists indexed by it
+NODE_TAGS = {
+    elem_type: tag
+    for tag, elem_type in enumerate(
+        ["vardef", "=", "fcall", "return", "if", "while", "int", "string", "bool", "nil", "qname", "neg", "!"]
+        + list(BINARY_OPCODES)
+    )
+}
+
+
+def dispatch_table(handlers):
+    table = [None] * len(NODE_TAGS)
+    for elem_type, handler in handlers.items():
+        table[NODE_TAGS[elem_type]] = handler
+    return table
+
+
+JUMP_OPCODES = {
+    JUMP,
+    JUMP_IF_FALSE,
+    JUMP_IF_TRUE,
+    BRANCH_IF_FALSE,
+    BRANCH_IF_TRUE,
+    HOIST_BEGIN,
+    AND_JUMP,
+    OR_JUMP,
+}
+SLOT_OPCODES = {LOAD_VAR, LOAD_VAR_CHECKED, STORE_VAR, DEFINE_VAR, CHECK_VAR, HOIST_END, LOAD_HOISTED}
+
+# largest pure function, in instructions, whose body is copied into its callers
+INLINE_MAX_INSTRUCTIONS = 16
+
+# python spelling of each binary operator inside a loop kernel; && and || use the
+# bitwise forms so both sides are always evaluated, as in the interpreter
+KERNEL_OPERATORS = {
+    ADD: "+",
+    SUB: "-",
+    MUL: "*",
+    DIV: "//",
+    EQ: "==",
+    NE: "!=",
+    LT: "<",
+    LE: "<=",
+    GT: ">",
+    GE: ">=",
+    AND: "&",
+    OR: "|",
+}
+
+# variables in a numba kernel stay within this magnitude; together with the static bounds
+# on every expression that keeps all intermediate results inside a 64 bit int
+KERNEL_VAR_BOUND = 2 ** 31
+KERNEL_INT_LIMIT = 2 ** 63 - 1
+
+# most results kept for calls to pure functions before the oldest are evicted
+CALL_CACHE_SIZE = 10000
+
+
+def printed_text(value):
+    # convert to lowercase if boolean
+    if type(value) == bool:
+        return "true" if value else "false"
+    return str(value)
+
+
+class CompiledFunction:
+    # attributes are read on every call, slots make those loads cheaper than a dict probe
+    __slots__ = (
+        "name",
+        "params",
+        "arity",
+        "param_slots",
+        "num_slots",
+        "local_slots",
+        "code",
+        "consts",
+        "names",
+        "calls",
+        "kernels",
+        "does_io",
+        "pure",
+    )
+
+    def __init__(self, name, params):
+        self.name = name
+        self.params = params
+        self.arity = len(params)
+        self.param_slots = []
+        self.num_slots = 0
+        self.local_slots = None # UNDEFINED per non-parameter slot, None if params repeat a name
+        self.code = []
+        self.consts = []
+        self.names = [] # variable name of each frame slot
+        self.calls = [] # CompiledFunction of each call site, indexed by the CALL operand
+        self.kernels = [] # LoopKernel of each RUN_KERNEL instruction
+        self.does_io = False # calls print, inputi or inputs directly
+        self.pure = False # no I/O anywhere in this function or its callees
+
+
+class LoopKernel:
+    """A while loop that only does int arithmetic, compiled to a python function over its variables"""
+
+    __slots__ = ("slots", "exact", "fast", "end")
+
+    def __init__(self, slots, exact, fast):
+        self.slots = slots # frame slot of each kernel argument
+        self.exact = exact # python version, returns the final variable values
+        self.fast = fast # numba version or None; returns (completed, values...)
+        self.end = 0 # ip just past the bytecode version of the loop
+
+    def run(self, values):
+        if self.fast is not None and all(-KERNEL_VAR_BOUND <= v <= KERNEL_VAR_BOUND for v in values):
+            try:
+                completed, *state = self.fast(*values)
+            except Exception:
+                # the loop has no side effects, so the exact version can redo it from the
+                # start and report any error itself
+                self.fast = None
+            else:
+                if completed:
+                    return state
+                # a variable outgrew the bound; finish from the start of that iteration
+                values = state
+        return self.exact(*values)
+
+
+class Compiler:
+    """Lowers a function's AST into a CompiledFunction"""
+
+    def __init__(self, functions):
+        self.functions = functions # (name, arity) -> CompiledFunction of every defined function
+
+    def compile_function(self, func_node, func):
+        params = func.params
+        self.func = func
+        self.defined = set(params) # variables known to be defined at this point
+
+        # every parameter and declared variable gets a fixed index in the frame
+        self.slots = {}
+        self.func.param_slots = [self.slot(param) for param in params]
+        self.resolve_slots(func_node.dict["statements"])
+        self.hoisted = {} # id of a hoisted expression node -> slot holding its value
+
+        self.fold_statements(func_node.dict["statements"])
+        for statement in func_node.dict["statements"]:
+            self.tag_nodes(statement)
+        self.compile_statements(func_node.dict["statements"])
+        # falling off the end of a function returns nil
+        self.emit(LOAD_CONST, self.const(None))
+        self.emit(RETURN)
+
+        # hoisting may have added slots while compiling
+        self.func.num_slots = len(self.slots)
+        if len(set(params)) == len(params):
+            # parameters fill the first slots, so a frame is just the args plus these
+            self.func.local_slots = [UNDEFINED] * (len(self.slots) - len(params))
+        return self.func
+
+    def inline_calls(self, func):
+        """Replace calls to small pure functions that call nothing with a copy of their code"""
+        self.func = func
+        old_code = func.code
+        new_code = []
+        new_ip = {} # ip of each instruction in old_code -> its ip in new_code
+        jumps = [] # operands in new_code still holding a jump target in old_code
+
+        for ip in range(0, len(old_code), 2):
+            op = old_code[ip]
+            arg = old_code[ip + 1]
+            new_ip[ip] = len(new_code)
+            if (op == CALL or op == TAIL_CALL) and self.inlinable(func.calls[arg]):
+                self.splice(func.calls[arg], new_code)
+                continue
+            if op in JUMP_OPCODES:
+                jumps.append(len(new_code) + 1)
+            new_code.append(op)
+            new_code.append(arg)
+        new_ip[len(old_code)] = len(new_code)
+
+        for operand_index in jumps:
+            new_code[operand_index] = new_ip[new_code[operand_index]]
+        for kernel in func.kernels:
+            kernel.end = new_ip[kernel.end]
+        func.code = new_code
+        if func.local_slots is not None:
+            func.local_slots = [UNDEFINED] * (func.num_slots - func.arity)
+
+    def inlinable(self, callee):
+        # a callee without calls of its own can never inline itself
+        return (
+            callee.pure
+            and callee.local_slots is not None
+            and len(callee.code) <= 2 * INLINE_MAX_INSTRUCTIONS
+            and CALL not in callee.code[::2]
+            and TAIL_CALL not in callee.code[::2]
+            and RUN_KERNEL not in callee.code[::2]
+        )
+
+    def splice(self, callee, code):
+        # the callee's variables get fresh slots at the end of the caller's frame
+        base = self.func.num_slots
+        self.func.num_slots += callee.num_slots
+        self.func.names.extend(callee.names)
+
+        # arguments are on the stack with the last one on top
+        for slot in reversed(callee.param_slots):
+            code.append(STORE_VAR)
+            code.append(base + slot)
+        # every call starts with the callee's variables undefined again
+        undefined = self.const(UNDEFINED)
+        for slot in range(callee.arity, callee.num_slots):
+            code.extend((LOAD_CONST, undefined, STORE_VAR, base + slot))
+
+        start = len(code)
+        end = start + len(callee.code)
+        for ip in range(0, len(callee.code), 2):
+            op = callee.code[ip]
+            arg = callee.code[ip + 1]
+            if op in SLOT_OPCODES:
+                arg += base
+            elif op == LOAD_CONST or op == ERROR:
+                arg = self.const(callee.consts[arg])
+            elif op in JUMP_OPCODES:
+                arg += start
+            elif op == RETURN:
+                # the return value is left on the stack for the caller
+                op = JUMP
+                arg = end
+            code.append(op)
+            code.append(arg)
+
+    def emit(self, op, arg=0):
+        self.func.code.append(op)
+        self.func.code.append(arg)
+        return len(self.func.code) - 1 # index of the operand, used to patch jumps
+
+    def patch(self, operand_index):
+        self.func.code[operand_index] = len(self.func.code)
+
+    def const(self, value):
+        # reuse the slot for an identical constant (type included, since True == 1)
+        for i, c in enumerate(self.func.consts):
+            if type(c) == type(value) and c == value:
+                return i
+        self.func.consts.append(value)
+        return len(self.func.consts) - 1
+
+    def slot(self, var_name):
+        if var_name not in self.slots:
+            self.slots[var_name] = len(self.slots)
+            self.func.names.append(var_name)
+        return self.slots[var_name]
+
+    def resolve_slots(self, statements):
+        for statement in statements:
+            if statement.elem_type == "vardef":
+                self.slot(statement.dict["name"])
+            for key in ("statements", "else_statements"):
+                if statement.dict.get(key):
+                    self.resolve_slots(statement.dict[key])
+
+    def undefined_variable(self, var_name):
+        # the name is never declared in this function so any use fails
+        self.error(ErrorType.NAME_ERROR, f"Variable {var_name} has not been defined")
+
+    def error(self, error_type, description):
+        self.emit(ERROR, self.const((error_type, description)))
+
+    def tag_nodes(self, node):
+        node.tag = NODE_TAGS[node.elem_type]
+        for value in node.dict.values():
+            if isinstance(value, Element):
+                self.tag_nodes(value)
+            elif isinstance(value, list):
+                for child in value:
+                    self.tag_nodes(child)
+
+    def fold_statements(self, statements):
+        for statement in statements:
+            for key in ("condition", "expression"):
+                if statement.dict.get(key) is not None:
+                    statement.dict[key] = self.fold_expression(statement.dict[key])
+            if statement.elem_type == "fcall":
+                statement.dict["args"] = [self.fold_expression(arg) for arg in statement.dict["args"]]
+            for key in ("statements", "else_statements"):
+                if statement.dict.get(key):
+                    self.fold_statements(statement.dict[key])
+
+    def fold_expression(self, expression):
+        """Replace operators whose operands are all literals with the literal result"""
+        if expression.elem_type == "fcall":
+            expression.dict["args"] = [self.fold_expression(arg) for arg in expression.dict["args"]]
+            return expression
+        if "op1" not in expression.dict:
+            return expression
+
+        op1 = expression.dict["op1"] = self.fold_expression(expression.dict["op1"])
+        if op1.elem_type not in LITERAL_NODES:
+            return expression
+        op1_val = op1.get("val")
+
+        if expression.elem_type == "neg":
+            if type(op1_val) == int:
+                return self.literal(-op1_val)
+            return expression
+        if expression.elem_type == "!":
+            if type(op1_val) == bool:
+                return self.literal(not op1_val)
+            return expression
+
+        op2 = expression.dict["op2"] = self.fold_expression(expression.dict["op2"])
+        if op2.elem_type not in LITERAL_NODES:
+            return expression
+        op2_val = op2.get("val")
+
+        op_type = BINARY_OPCODES[expression.elem_type]
+        if op_type == EQ or op_type == NE:
+            equal = type(op1_val) == type(op2_val) and op1_val == op2_val
+            return self.literal(equal if op_type == EQ else not equal)
+
+        # anything that would raise at runtime is left for the runtime to report
+        specialization = SPECIALIZATIONS.get((op_type, type(op1_val)))
+        if type(op1_val) != type(op2_val) or specialization is None:
+            return expression
+        if op_type == DIV and op2_val == 0:
+            return expression
+        return self.literal(specialization[1](op1_val, op2_val))
+
+    def literal(self, value):
+        if type(value) == bool:
+            return Element("bool", val=value)
+        if type(value) == int:
+            return Element("int", val=value)
+        return Element("string", val=value)
+
+    def compile_statements(self, statements):
+        for statement in statements:
+            compile_stmt = self.STMT_COMPILERS[statement.tag]
+            # expression statements other than function calls are never evaluated
+            if compile_stmt is not None:
+                compile_stmt(self, statement)
+
+    def compile_definition(self, statement):
+        var_name = statement.dict["name"]
+        self.emit(DEFINE_VAR, self.slots[var_name])
+        self.defined.add(var_name)
+
+    def compile_assignment(self, statement):
+        var_name = statement.dict["var"]
+        if var_name not in self.slots:
+            self.undefined_variable(var_name)
+            return
+        # the variable has to be checked before the right hand side runs
+        if var_name not in self.defined:
+            self.emit(CHECK_VAR, self.slots[var_name])
+        self.compile_expression(statement.dict["expression"])
+        self.emit(STORE_VAR, self.slots[var_name])
+
+    def compile_call_statement(self, statement):
+        # a call used as a statement discards its value
+        self.compile_call(statement)
+        self.emit(POP)
+
+    def compile_return(self, statement):
+        expression = statement.dict["expression"]
+        if expression is None:
+            self.emit(LOAD_CONST, self.const(None))
+        else:
+            self.compile_expression(expression)
+            if expression.elem_type == "fcall" and self.func.code[-2] == CALL:
+                self.func.code[-2] = TAIL_CALL
+        # after a tail call this is only reached when the call cache answered it
+        self.emit(RETURN)
+
+    def compile_block(self, statements):
+        # definitions inside a block are only guaranteed after the block runs
+        outer_defined = set(self.defined)
+        self.compile_statements(statements)
+        self.defined = outer_defined
+
+    def compile_condition(self, condition, jump_if_true):
+        # returns the operand index of the emitted jump for patching
+        self.compile_expression(condition)
+        if condition.elem_type in BOOL_NODES:
+            return self.emit(BRANCH_IF_TRUE if jump_if_true else BRANCH_IF_FALSE)
+        return self.emit(JUMP_IF_TRUE if jump_if_true else JUMP_IF_FALSE)
+
+    def compile_if(self, statement):
+        jump_to_else = self.compile_condition(statement.dict["condition"], False)
+        self.compile_block(statement.dict["statements"])
+
+        else_statements = statement.dict["else_statements"]
+        if else_statements:
+            jump_to_end = self.emit(JUMP)
+            self.patch(jump_to_else)
+            self.compile_block(else_statements)
+            self.patch(jump_to_end)
+        else:
+            self.patch(jump_to_else)
+
+    def compile_while(self, statement):
+        # an int-only loop runs as a kernel when its variables hold ints on entry;
+        # otherwise execution falls through to the bytecode loop below
+        kernel = self.loop_kernel(statement)
+        if kernel is not None:
+            self.func.kernels.append(kernel)
+            self.emit(RUN_KERNEL, len(self.func.kernels) - 1)
+
+        self.hoist_invariants(statement)
+
+        # the condition is tested once on entry and again at the bottom of the body,
+        # so each iteration takes a single conditional jump back to the top
+        condition = statement.dict["condition"]
+        jump_to_end = self.compile_condition(condition, False)
+        loop_start = len(self.func.code)
+        self.compile_block(statement.dict["statements"])
+        jump_to_start = self.compile_condition(condition, True)
+        self.func.code[jump_to_start] = loop_start
+        self.patch(jump_to_end)
+
+        if kernel is not None:
+            kernel.end = len(self.func.code)
+
+    def hoist_invariants(self, statement):
+        """Evaluate the loop's call free expressions over variables it never assigns once up front"""
+        assigned = set()
+        self.assigned_variables(statement.dict["statements"], assigned)
+        invariants = []
+        self.collect_invariants(statement.dict["condition"], assigned, invariants)
+        self.find_statement_invariants(statement.dict["statements"], assigned, invariants)
+
+        for expression in invariants:
+            if id(expression) in self.hoisted:
+                continue # already hoisted out of an enclosing loop
+            # the name can never clash with a Brewin variable
+            slot = self.slot(f"<hoisted {len(self.slots)}>")
+            # a value left over from an earlier run of the loop must not be reused
+            self.emit(LOAD_CONST, self.const(UNDEFINED))
+            self.emit(STORE_VAR, slot)
+            on_error = self.emit(HOIST_BEGIN)
+            self.compile_expression(expression)
+            self.emit(HOIST_END, slot)
+            self.patch(on_error)
+            self.hoisted[id(expression)] = slot
+
+    def assigned_variables(self, statements, assigned):
+        for statement in statements:
+            if statement.elem_type == "=":
+                assigned.add(statement.dict["var"])
+            elif statement.elem_type == "vardef":
+                assigned.add(statement.dict["name"])
+            elif statement.elem_type == "if":
+                self.assigned_variables(statement.dict["statements"], assigned)
+                self.assigned_variables(statement.dict["else_statements"] or [], assigned)
+            elif statement.elem_type == "while":
+                self.assigned_variables(statement.dict["statements"], assigned)
+
+    def find_statement_invariants(self, statements, assigned, invariants):
+        for statement in statements:
+            if statement.elem_type == "=" or statement.elem_type == "return":
+                if statement.dict["expression"] is not None:
+                    self.collect_invariants(statement.dict["expression"], assigned, invariants)
+            elif statement.elem_type == "fcall":
+                self.collect_invariants(statement, assigned, invariants)
+            elif statement.elem_type == "if" or statement.elem_type == "while":
+                self.collect_invariants(statement.dict["condition"], assigned, invariants)
+                self.find_statement_invariants(statement.dict["statements"], assigned, invariants)
+                if statement.elem_type == "if":
+                    self.find_statement_invariants(statement.dict["else_statements"] or [], assigned, invariants)
+
+    def find_invariants(self, expression, assigned, invariants):
+        """Collect the largest invariant operator subexpressions; returns whether expression is invariant"""
+        elem_type = expression.elem_type
+        if elem_type in LITERAL_NODES:
+            return True
+        if elem_type == "qname":
+            return expression.dict["name"] not in assigned
+        if elem_type == "fcall":
+            for arg in expression.dict["args"]:
+                self.collect_invariants(arg, assigned, invariants)
+            return False
+
+        operands = [expression.dict["op1"]]
+        if "op2" in expression.dict:
+            operands.append(expression.dict["op2"])
+        invariant = [self.find_invariants(operand, assigned, invariants) for operand in operands]
+        if all(invariant):
+            return True
+        for operand, operand_invariant in zip(operands, invariant):
+            if operand_invariant:
+                self.add_invariant(operand, invariants)
+        return False
+
+    def collect_invariants(self, expression, assigned, invariants):
+        if self.find_invariants(expression, assigned, invariants):
+            self.add_invariant(expression, invariants)
+
+    def add_invariant(self, expression, invariants):
+        # literals and plain variables are already a single load
+        if expression.elem_type not in LITERAL_NODES and expression.elem_type != "qname":
+            invariants.append(expression)
+
+    def loop_kernel(self, statement):
+        """LoopKernel for a while loop using only int variables and arithmetic, or None"""
+        names = []
+        self.kernel_variables(statement, names)
+        if not all(name in self.slots for name in names):
+            return None
+        self.kernel_vars = {name: i for i, name in enumerate(names)}
+
+        exact = self.kernel_function(statement, False)
+        if exact is None:
+            return None
+        fast = None
+        if njit is not None:
+            fast = self.kernel_function(statement, True)
+            if fast is not None:
+                fast = njit(fast)
+        return LoopKernel([self.slots[name] for name in names], exact, fast)
+
+    def kernel_variables(self, node, names):
+        for value in node.dict.values():
+            if isinstance(value, Element):
+                self.kernel_variables(value, names)
+            elif isinstance(value, list):
+                for child in value:
+                    self.kernel_variables(child, names)
+        if node.elem_type == "qname":
+            name = node.dict["name"]
+        elif node.elem_type == "=":
+            name = node.dict["var"]
+        else:
+            return
+        if name not in names:
+            names.append(name)
+
+    def kernel_function(self, statement, guarded):
+        # guarded kernels bail out with the variables from the start of the current
+        # iteration once a variable leaves the bound the static checks assumed
+        lines = []
+        if not self.kernel_while(statement, lines, "    ", guarded, True):
+            return None
+        variables = "(" + "".join(f"v{i}, " for i in range(len(self.kernel_vars))) + ")"
+        if guarded:
+            lines.append(f"    return (True,) + {variables}")
+        else:
+            lines.append(f"    return {variables}")
+        params = ", ".join(f"v{i}" for i in range(len(self.kernel_vars)))
+        source = f"def kernel({params}):\n" + "\n".join(lines) + "\n"
+
+        namespace = {}
+        try:
+            exec(source, namespace)
+        except (SyntaxError, RecursionError):
+            # deeper nesting than Python compiles (20 blocks, limited indentation);
+            # the loop runs as bytecode like any other
+            return None
+        return namespace["kernel"]
+
+    def kernel_while(self, statement, lines, indent, guarded, outermost):
+        condition = self.kernel_expression(statement.dict["condition"], guarded)
+        if condition is None or condition[1] is not bool:
+            return False
+        lines.append(f"{indent}while {condition[0]}:")
+        if guarded and outermost:
+            variables = "(" + "".join(f"v{i}, " for i in range(len(self.kernel_vars))) + ")"
+            lines.append(f"{indent}    snapshot = {variables}")
+        return self.kernel_statements(statement.dict["statements"], lines, indent + "    ", guarded)
+
+    def kernel_statements(self, statements, lines, indent, guarded):
+        first_line = len(lines)
+        for statement in statements:
+            if statement.elem_type == "=":
+                expression = self.kernel_expression(statement.dict["expression"], guarded)
+                if expression is None or expression[1] is not int:
+                    return False
+                var = f"v{self.kernel_vars[statement.dict['var']]}"
+                lines.append(f"{indent}{var} = {expression[0]}")
+                if guarded:
+                    lines.append(f"{indent}if {var} > {KERNEL_VAR_BOUND} or {var} < -{KERNEL_VAR_BOUND}:")
+                    lines.append(f"{indent}    return (False,) + snapshot")
+            elif statement.elem_type == "if":
+                condition = self.kernel_expression(statement.dict["condition"], guarded)
+                if condition is None or condition[1] is not bool:
+                    return False
+                lines.append(f"{indent}if {condition[0]}:")
+                if not self.kernel_statements(statement.dict["statements"], lines, indent + "    ", guarded):
+                    return False
+                if statement.dict["else_statements"]:
+                    lines.append(f"{indent}else:")
+                    if not self.kernel_statements(statement.dict["else_statements"], lines, indent + "    ", guarded):
+                        return False
+            elif statement.elem_type == "while":
+                if not self.kernel_while(statement, lines, indent, guarded, False):
+                    return False
+            elif self.STMT_COMPILERS[statement.tag] is not None:
+                # definitions, calls and returns keep the loop in the interpreter
+                return False
+        if len(lines) == first_line:
+            lines.append(f"{indent}pass")
+        return True
+
+    def kernel_expression(self, expression, guarded):
+        """(python source, result type, bound on the result's magnitude) or None if not int/bool only"""
+        elem_type = expression.elem_type
+        if elem_type == "int":
+            val = expression.dict["val"]
+            return repr(val), int, abs(val)
+        if elem_type == "bool":
+            return repr(expression.dict["val"]), bool, 0
+        if elem_type == "qname":
+            return f"v{self.kernel_vars[expression.dict['name']]}", int, KERNEL_VAR_BOUND
+
+        if elem_type == "neg" or elem_type == "!":
+            op1 = self.kernel_expression(expression.dict["op1"], guarded)
+            if op1 is None:
+                return None
+            if elem_type == "neg" and op1[1] is int:
+                return f"(-{op1[0]})", int, op1[2]
+            if elem_type == "!" and op1[1] is bool:
+                return f"(not {op1[0]})", bool, 0
+            return None
+
+        if elem_type not in BINARY_OPCODES:
+            return None
+        op1 = self.kernel_expression(expression.dict["op1"], guarded)
+        op2 = self.kernel_expression(expression.dict["op2"], guarded)
+        if op1 is None or op2 is None or op1[1] is not op2[1]:
+            return None
+        op_type = BINARY_OPCODES[elem_type]
+        source = f"({op1[0]} {KERNEL_OPERATORS[op_type]} {op2[0]})"
+
+        if op_type == EQ or op_type == NE:
+            return source, bool, 0
+        if op_type == AND or op_type == OR:
+            return (source, bool, 0) if op1[1] is bool else None
+        if op1[1] is not int:
+            return None
+        if op_type in (LT, LE, GT, GE):
+            return source, bool, 0
+
+        if op_type == ADD or op_type == SUB:
+            bound = op1[2] + op2[2]
+        elif op_type == MUL:
+            bound = op1[2] * op2[2]
+        else:
+            bound = op1[2]
+        if guarded and bound > KERNEL_INT_LIMIT:
+            return None
+        return source, int, bound
+
+    def compile_expression(self, expression):
+        slot = self.hoisted.get(id(expression))
+        if slot is not None:
+            # LOAD_HOISTED takes the jump below when the value was computed before the
+            # loop and falls through to the expression's own code otherwise
+            self.emit(LOAD_HOISTED, slot)
+            jump_to_end = self.emit(JUMP)
+            self.EXPR_COMPILERS[expression.tag](self, expression)
+            self.patch(jump_to_end)
+        else:
+            self.EXPR_COMPILERS[expression.tag](self, expression)
+
+    def compile_literal(self, expression):
+        self.emit(LOAD_CONST, self.const(expression.dict["val"]))
+
+    def compile_nil(self, expression):
+        self.emit(LOAD_CONST, self.const(None)) # represent nil as python None type
+
+    def compile_variable(self, expression):
+        var_name = expression.dict["name"]
+        if var_name not in self.slots:
+            self.undefined_variable(var_name)
+        elif var_name in self.defined:
+            self.emit(LOAD_VAR, self.slots[var_name])
+        else:
+            self.emit(LOAD_VAR_CHECKED, self.slots[var_name])
+
+    def compile_call(self, expression):
+        func_name = expression.dict["name"]
+        args = expression.dict["args"]
+
+        if func_name in ("print", "inputi", "inputs"):
+            self.func.does_io = True
+
+        if func_name == "print":
+            # literals are turned into their printed text once, here, and each run of
+            # adjacent literals becomes a single string
+            count = 0
+            text = None
+            for arg in args:
+                if arg.elem_type in LITERAL_NODES:
+                    value = None if arg.elem_type == "nil" else arg.dict["val"]
+                    text = (text or "") + printed_text(value)
+                    continue
+                if text is not None:
+                    self.emit(LOAD_CONST, self.const(text))
+                    count += 1
+                    text = None
+                self.compile_expression(arg)
+                count += 1
+            if text is not None:
+                self.emit(LOAD_CONST, self.const(text))
+                count += 1
+            self.emit(PRINT, count)
+        elif func_name == "inputi" or func_name == "inputs":
+            # inputi/inputs can only have max of 1 parameter
+            if len(args) > 1:
+                self.error(ErrorType.NAME_ERROR, f"Too many arguments given for {func_name}")
+                return
+            for arg in args:
+                self.compile_expression(arg)
+            self.emit(INPUTI if func_name == "inputi" else INPUTS, len(args))
+        elif (func_name, len(args)) not in self.functions:
+            # arguments are never evaluated for an undefined function
+            self.error(ErrorType.NAME_ERROR, f"Function {func_name} has not been defined")
+        else:
+            for arg in args:
+                self.compile_expression(arg)
+            # bind the call site to its callee now so calls skip the function table
+            self.func.calls.append(self.functions[(func_name, len(args))])
+            self.emit(CALL, len(self.func.calls) - 1)
+
+    def compile_unary_op(self, expression):
+        self.compile_expression(expression.dict["op1"])
+        self.emit(NEG if expression.elem_type == "neg" else NOT)
+
+    def compile_binary_op(self, expression):
+        op1 = expression.dict["op1"]
+        op2 = expression.dict["op2"]
+        self.compile_expression(op1)
+
+        # && and || evaluate both sides, but when skipping the right one cannot be
+        # observed it is only evaluated if the left one does not decide the result
+        if expression.elem_type in ("&&", "||") and self.cannot_fail_bool(op2):
+            jump_to_end = self.emit(AND_JUMP if expression.elem_type == "&&" else OR_JUMP)
+            self.compile_expression(op2)
+            self.patch(jump_to_end)
+            return
+
+        self.compile_expression(op2)
+
+        op_type = BINARY_OPCODES[expression.elem_type]
+        operand_type = self.static_type(op1)
+        specialization = SPECIALIZATIONS.get((op_type, operand_type))
+        if specialization is not None and self.static_type(op2) is operand_type:
+            self.emit(specialization[0] + UNGUARDED_OFFSET)
+        else:
+            self.emit(op_type)
+
+    def cannot_fail(self, expression):
+        """Whether evaluating expression can never raise an error or have a side effect"""
+        if expression.elem_type in LITERAL_NODES:
+            return True
+        if expression.elem_type == "qname":
+            return expression.dict["name"] in self.defined
+        if expression.elem_type == "==" or expression.elem_type == "!=":
+            return self.cannot_fail(expression.dict["op1"]) and self.cannot_fail(expression.dict["op2"])
+        return False
+
+    def cannot_fail_bool(self, expression):
+        elem_type = expression.elem_type
+        if elem_type == "bool" or elem_type == "==" or elem_type == "!=":
+            return self.cannot_fail(expression)
+        if elem_type == "&&" or elem_type == "||":
+            return self.cannot_fail_bool(expression.dict["op1"]) and self.cannot_fail_bool(expression.dict["op2"])
+        return False
+
+    def static_type(self, expression):
+        """Python type an expression is known to evaluate to, or None if it depends on runtime values"""
+        elem_type = expression.elem_type
+        if elem_type == "int":
+            return int
+        if elem_type == "string":
+            return str
+        if elem_type == "bool":
+            return bool
+        if elem_type in RESULT_TYPES:
+            return RESULT_TYPES[elem_type]
+        if elem_type == "+":
+            # + keeps the type of its operands, which have to match
+            operand_type = self.static_type(expression.dict["op1"])
+            if operand_type is not None and self.static_type(expression.dict["op2"]) is operand_type:
+                return operand_type
+            return None
+        if elem_type == "fcall":
+            func_name = expression.dict["name"]
+            if func_name == "inputi" and len(expression.dict["args"]) <= 1:
+                return int
+            if func_name == "inputs" and len(expression.dict["args"]) <= 1:
+                return str
+        return None
+
+    STMT_COMPILERS = dispatch_table({
+        "vardef": compile_definition,
+        "=": compile_assignment,
+        "fcall": compile_call_statement,
+        "return": compile_return,
+        "if": compile_if,
+        "while": compile_while,
+    })
+
+    EXPR_COMPILERS = dispatch_table({
+        "int": compile_literal,
+        "string": compile_literal,
+        "bool": compile_literal,
+        "nil": compile_nil,
+        "fcall": compile_call,
+        "qname": compile_variable,
+        "neg": compile_unary_op,
+        "!": compile_unary_op,
+        "+": compile_binary_op,
+        "-": compile_binary_op,
+        "*": compile_binary_op,
+        "/": compile_binary_op,
+        "==": compile_binary_op,
+        "!=": compile_binary_op,
+        ">": compile_binary_op,
+        ">=": compile_binary_op,
+        "<": compile_binary_op,
+        "<=": compile_binary_op,
+        "||": compile_binary_op,
+        "&&": compile_binary_op,
+    })
+
+
 class Interpreter(InterpreterBase):
     def __init__(self, console_output=True, inp=None, trace_output=False):
         super().__init__(console_output, inp)   # call InterpreterBase's constructor
-        self.variables = {} # dict to hold variables
-    
+        # handlers for the less frequent opcodes, indexed by opcode
+        self.handlers = [None] * ADD
+        self.handlers[POP] = self.do_pop
+        self.handlers[PRINT] = self.do_print
+        self.handlers[INPUTI] = self.do_inputi_call
+        self.handlers[INPUTS] = self.do_inputs_call
+        self.handlers[NEG] = self.eval_neg
+        self.handlers[NOT] = self.eval_not
+        self.handlers[ERROR] = self.do_error
+
     def run(self, program):
         ast = parse_program(program=program)
 
         # store all functions. Key will store (name, arity)
         self.functions = {}
+        self.call_cache = OrderedDict() # results of earlier calls to pure functions
         self.define_functions(ast)
 
         # check if main function exists
@@ -24,244 +1008,272 @@ class Interpreter(InterpreterBase):
         self.run_func(self.functions[("main", 0)], [])
 
     def define_functions(self, ast):
+        nodes = {}
         for f in ast.dict["functions"]:
             name = f.dict["name"]
             arity = len(f.dict["args"])
-            self.functions[(name, arity)] = f
-        
+            nodes[(name, arity)] = f
+            params = [arg.dict["name"] for arg in f.dict["args"]]
+            self.functions[(name, arity)] = CompiledFunction(name, params)
+
+        # compile every function once up front
+        compiler = Compiler(self.functions)
+        for key, f in nodes.items():
+            compiler.compile_function(f, self.functions[key])
+        self.find_pure_functions()
+        for function in self.functions.values():
+            compiler.inline_calls(function)
+
+    def find_pure_functions(self):
+        # a function is pure if neither it nor anything it calls does I/O, so its result
+        # depends only on its arguments; start optimistic and knock out until stable
+        for function in self.functions.values():
+            function.pure = not function.does_io
+        changed = True
+        while changed:
+            changed = False
+            for function in self.functions.values():
+                if function.pure and not all(callee.pure for callee in function.calls):
+                    function.pure = False
+                    changed = True
+
     # support functions with parameters
     def run_func(self, function, args):
-        # function scopes -> save old scope when we return from func call
-        old_scope = self.variables
-        self.variables = {}
-
-        # add function args to function's variables
-        params = function.dict["args"]
-        for param, arg in zip(params, args):
-            self.variables[param.dict["name"]] = arg
-
-        ret_val = None
-        for statement in function.dict["statements"]:
-            ret_val = self.run_statement(statement)
-            if isinstance(ret_val, tuple) and ret_val[0] is True:
-                ret_val = ret_val[1]
-                break
-            
-        self.variables = old_scope
-        return ret_val
-
-    def run_statement(self, statement):
-        if statement.elem_type == "vardef":
-            self.do_definition(statement)
-        elif statement.elem_type == "=":
-            self.do_assignment(statement)
-        elif statement.elem_type == "fcall":
-            self.do_func_call(statement)
-        elif statement.elem_type == "return":
-            return self.do_return(statement)
-        elif statement.elem_type == "if":
-            return self.do_if(statement)
-        elif statement.elem_type == "while":
-            return self.do_while(statement)
-
-    def do_while(self, while_node):
-        # evaluate condition and check if bool
-        cond = self.evaluate_expression(while_node.dict["condition"])
-
-        if not type(cond) == bool:
-           super().error(
-               ErrorType.TYPE_ERROR,
-               f"If condition does not evaluate to a boolean",
-           )
-        
-        while cond:
-            for statement in while_node.dict["statements"]:
-                ret_val = self.run_statement(statement)
-                if ret_val is not None:
-                    return ret_val
-                cond = self.evaluate_expression(while_node.dict["condition"])
-        return None
+        # add function args to function's frame
+        frame = [UNDEFINED] * function.num_slots
+        for slot, arg in zip(function.param_slots, args):
+            frame[slot] = arg
+        return self.execute(function, frame)
 
-    def do_definition(self, variable):
-        var_name = variable.dict["name"]
-        # return error if redefinition is attempted
-        if var_name in self.variables:
-            super().error(
-                ErrorType.NAME_ERROR,
-                f"Variable {var_name} defined more than once",
-            )
-        self.variables[var_name] = None
-    
-    def do_assignment(self, variable):
-        var_name = variable.dict["var"]
-        # variable must be defined beforehand, return error
-        if var_name not in self.variables:
-            super().error(
-                ErrorType.NAME_ERROR,
-                f"Variable {var_name} has not been defined",
-            )
-        expression = variable.dict["expression"]
-        val = self.evaluate_expression(expression)
-        self.variables[var_name] = val
+    def execute(self, function, frame):
+        # attributes of the running function are kept in locals and only reloaded
+        # when a call or return switches functions
+        code = function.code
+        consts = function.consts
+        calls = function.calls
+        handlers = self.handlers
+        call_cache = self.call_cache
+        # one operand stack is shared by all calls; a callee's values sit above its caller's
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        # (function, code, consts, calls, frame, ip, cache key) of every caller waiting on
+        # a return; restoring them all from one tuple avoids reloading attributes
+        call_stack = []
+        ip = 0
 
-    def do_func_call(self, function):
-        func_name = function.dict["name"]
-        func_args = function.dict["args"]
-        if func_name == "print":
-            self.do_print(function)
-            return None
-        elif func_name == "inputi":
-            input = self.do_inputi_call(function)
-            return input
-        elif func_name == "inputs":
-            input = self.do_inputs_call(function)
-            return input
-        else:
-            # check for user-defined function
-            if (func_name, len(func_args)) not in self.functions:
-                super().error(
-                    ErrorType.NAME_ERROR,
-                    f"Function {func_name} has not been defined",
-                )   
-            
-            evaluated_args = [self.evaluate_expression(arg) for arg in func_args]
-            return self.run_func(self.functions[(func_name, len(func_args))], evaluated_args)
-
-    def do_return(self, statement):
-        expression = statement.dict["expression"]
-        # tuple (ifReturnCalled, val) to differentiate whether or not return was called
-        if expression is None:
-            return (True, None)
-        return (True, self.evaluate_expression(expression))
-
-    def do_if(self, if_node):
-        # evaluate condition and check if bool
-        cond = self.evaluate_expression(if_node.dict["condition"])
-
-        if not type(cond) == bool:
-           super().error(
-               ErrorType.TYPE_ERROR,
-               f"If condition does not evaluate to a boolean",
-           )
-        
-        if cond:
-            for statement in if_node.dict["statements"]:
-                ret_val = self.run_statement(statement)
-                if ret_val is not None:
-                    return ret_val
-        else:
-            else_statements = if_node.dict["else_statements"]
-            if else_statements:
-                for statement in else_statements:
-                    ret_val = self.run_statement(statement)
-                    if ret_val is not None:
-                        return ret_val
-        
-        return None
-    
-    def do_print(self, print_node): 
-        text = ""
-        for arg in print_node.dict['args']:
-            # convert to lowercase if boolean
-            val = self.evaluate_expression(arg)
-            if type(val) == bool:
-                text += "true" if val else "false"
-            else:
-                text += str(val)
+        # ip to resume at if the hoisted expression being evaluated raises an error
+        hoist_failed_ip = None
+        hoist_depth = 0
+
+        while True:
+            try:
+                while True:
+                    op = code[ip]
+                    arg = code[ip + 1]
+                    ip += 2
+
+                    if op == LOAD_VAR:
+                        push(frame[arg])
+                    elif op == LOAD_CONST:
+                        push(consts[arg])
+                    elif op >= FIRST_UNGUARDED:
+                        op2_val = pop()
+                        push(SPECIALIZED_IMPLS[op](pop(), op2_val))
+                    elif op >= ADD_II:
+                        op2_val = pop()
+                        op1_val = pop()
+                        operand_type = OPERAND_TYPES[op]
+                        if type(op1_val) is operand_type and type(op2_val) is operand_type:
+                            push(SPECIALIZED_IMPLS[op](op1_val, op2_val))
+                        else:
+                            # operand types changed, go back to the generic instruction
+                            code[ip - 2] = GENERIC_OPS[op]
+                            push(self.eval_binary_op(GENERIC_OPS[op], op1_val, op2_val))
+                    elif op >= ADD:
+                        op2_val = pop()
+                        op1_val = pop()
+                        push(self.eval_binary_op(op, op1_val, op2_val))
+                        if type(op1_val) is type(op2_val):
+                            specialization = SPECIALIZATIONS.get((op, type(op1_val)))
+                            if specialization is not None:
+                                code[ip - 2] = specialization[0]
+                    elif op == STORE_VAR:
+                        frame[arg] = pop()
+                    elif op == BRANCH_IF_FALSE:
+                        if not pop():
+                            ip = arg
+                    elif op == BRANCH_IF_TRUE:
+                        if pop():
+                            ip = arg
+                    elif op == JUMP_IF_FALSE or op == JUMP_IF_TRUE:
+                        cond = pop()
+                        if not type(cond) == bool:
+                            super().error(
+                                ErrorType.TYPE_ERROR,
+                                f"If condition does not evaluate to a boolean",
+                            )
+                        if cond == (op == JUMP_IF_TRUE):
+                            ip = arg
+                    elif op == JUMP:
+                        ip = arg
+                    elif op == DEFINE_VAR:
+                        # return error if redefinition is attempted
+                        if frame[arg] is not UNDEFINED:
+                            self.do_redefinition(function.names[arg])
+                        frame[arg] = None
+                    elif op == LOAD_VAR_CHECKED or op == CHECK_VAR:
+                        # variable must be defined beforehand, return error
+                        if frame[arg] is UNDEFINED:
+                            self.do_undefined_variable(function.names[arg])
+                        if op == LOAD_VAR_CHECKED:
+                            push(frame[arg])
+                    elif op == CALL or op == TAIL_CALL:
+                        callee = calls[arg]
+                        arity = callee.arity
+                        if arity:
+                            args = stack[-arity:]
+                            del stack[-arity:]
+                        else:
+                            args = []
+
+                        key = None
+                        if callee.pure:
+                            # types are part of the key since True == 1 and both hash the same
+                            key = (callee, tuple(args), tuple(type(a) for a in args))
+                            ret_val = call_cache.get(key, UNDEFINED)
+                            if ret_val is not UNDEFINED:
+                                call_cache.move_to_end(key)
+                                push(ret_val)
+                                continue
+
+                        # park the caller and continue in the callee's code; a tail call's result
+                        # is the caller's result, so the callee simply takes over the caller's place
+                        if op == CALL:
+                            call_stack.append((function, code, consts, calls, frame, ip, key))
+                        function = callee
+                        code = callee.code
+                        consts = callee.consts
+                        calls = callee.calls
+                        if callee.local_slots is not None:
+                            frame = args + callee.local_slots
+                        else:
+                            frame = [UNDEFINED] * callee.num_slots
+                            for slot, arg in zip(callee.param_slots, args):
+                                frame[slot] = arg
+                        ip = 0
+                    elif op == RUN_KERNEL:
+                        kernel = function.kernels[arg]
+                        values = [frame[slot] for slot in kernel.slots]
+                        if all(type(val) is int for val in values):
+                            for slot, val in zip(kernel.slots, kernel.run(values)):
+                                frame[slot] = val
+                            ip = kernel.end
+                    elif op == AND_JUMP or op == OR_JUMP:
+                        if not type(stack[-1]) == bool:
+                            super().error(
+                                ErrorType.TYPE_ERROR,
+                                "Incompatible types for logical operation",
+                            )
+                        if stack[-1] == (op == OR_JUMP):
+                            ip = arg
+                        else:
+                            pop()
+                    elif op == LOAD_HOISTED:
+                        if frame[arg] is not UNDEFINED:
+                            push(frame[arg])
+                            ip = code[ip + 1] # operand of the JUMP past the expression's code
+                        else:
+                            ip += 2
+                    elif op == HOIST_BEGIN:
+                        hoist_failed_ip = arg
+                        hoist_depth = len(stack)
+                    elif op == HOIST_END:
+                        frame[arg] = pop()
+                        hoist_failed_ip = None
+                    elif op == RETURN:
+                        if not call_stack:
+                            return pop()
+                        function, code, consts, calls, frame, ip, key = call_stack.pop()
+                        if key is not None:
+                            call_cache[key] = stack[-1]
+                            if len(call_cache) > CALL_CACHE_SIZE:
+                                call_cache.popitem(last=False)
+                    else:
+                        handlers[op](function, arg, stack)
+            except Exception:
+                if hoist_failed_ip is None:
+                    raise
+                # the loop will evaluate the expression itself and report the error if it
+                # is ever reached, so forget this one
+                self.error_type = None
+                self.error_line = None
+                del stack[hoist_depth:]
+                ip = hoist_failed_ip
+                hoist_failed_ip = None
+
+    def do_redefinition(self, var_name):
+        super().error(
+            ErrorType.NAME_ERROR,
+            f"Variable {var_name} defined more than once",
+        )
+
+    def do_undefined_variable(self, var_name):
+        super().error(
+            ErrorType.NAME_ERROR,
+            f"Variable {var_name} has not been defined",
+        )
+
+    def do_pop(self, function, arg, stack):
+        stack.pop()
+
+    def do_error(self, function, arg, stack):
+        error_type, description = function.consts[arg]
+        super().error(error_type, description)
+
+    def do_print(self, function, arg, stack):
+        first = len(stack) - arg
+        text = "".join([val if type(val) is str else printed_text(val) for val in stack[first:]])
+        del stack[first:]
         # output using the output() method in InterpreterBase base class
         super().output(text)
+        stack.append(None)
 
-    def do_inputi_call(self, input_node):
-        # inputi can only have max of 1 parameter
-        args = input_node.dict["args"]
-        if len(args) > 1:
-            super().error(
-                ErrorType.NAME_ERROR,
-                "Too many arguments given for inputi",
-            )
-        
+    def do_inputi_call(self, function, arg, stack):
         # output prompt if there is one
-        if len(args) == 1:
-            prompt = self.evaluate_expression(args[0])
-            super().output(prompt)
-        
-        input = int(super().get_input())
-        return input
-    
-    def do_inputs_call(self, input_node):
-        # inputs can only have max of 1 parameter
-        args = input_node.dict["args"]
-        if len(args) > 1:
+        if arg == 1:
+            super().output(stack.pop())
+
+        stack.append(int(super().get_input()))
+
+    def do_inputs_call(self, function, arg, stack):
+        # output prompt if there is one
+        if arg == 1:
+            super().output(stack.pop())
+
+        stack.append(str(super().get_input()))
+
+    def eval_neg(self, function, arg, stack):
+        op1_val = stack.pop()
+        if not type(op1_val) == int:
             super().error(
-                ErrorType.NAME_ERROR,
-                "Too many arguments given for inputs",
+                ErrorType.TYPE_ERROR,
+                "Incompatible type for negation operator",
             )
-        
-        # output prompt if there is one
-        if len(args) == 1:
-            prompt = self.evaluate_expression(args[0])
-            super().output(prompt)
-        
-        input = str(super().get_input())
-        return input
-
-    def evaluate_expression(self, expression):
-        unary_operations  = {'neg', '!'}
-        binary_operations = {'+', '-', '*', '/', '==', '!=', '>', '>=', '<', '<=', '||', '&&' }
-        if expression.elem_type == "int":
-            return(expression.dict["val"])
-        elif expression.elem_type == "string":
-            return(expression.dict["val"])
-        elif expression.elem_type == "bool":
-            return(expression.dict["val"])
-        elif expression.elem_type == "nil":
-            return None # represent nil as python None type
-        elif expression.elem_type == "fcall":
-            return self.do_func_call(expression)
-        elif expression.elem_type in unary_operations:
-            return(self.eval_unary_op(expression))
-        elif expression.elem_type in binary_operations:
-            return(self.eval_binary_op(expression))
-        elif expression.elem_type == "qname":
-            var_name = expression.dict["name"]
-            # variable must be defined beforehand, return error
-            if var_name not in self.variables:
-                super().error(
-                    ErrorType.NAME_ERROR,
-                    f"Variable {var_name} has not been defined",
-                )
-            return self.variables[var_name]
-    
-    def eval_unary_op(self, expression):
-        op_type = expression.elem_type
-        op1 = expression.dict["op1"]
-        op1_val = self.evaluate_expression(op1)
+        stack.append(-op1_val)
 
-        if op_type == "neg":
-            if not type(op1_val) == int:
-                super().error(
-                    ErrorType.TYPE_ERROR,
-                    "Incompatible type for negation operator",
-                )
-            return -op1_val
-        
-        elif op_type == "!":
-            if not type(op1_val) == bool:
-                super().error(
-                    ErrorType.TYPE_ERROR,
-                    "Incompatible type for logical NOT operator",
-                )
-            return not op1_val
-             
-    def eval_binary_op(self, expression):
-        op_type = expression.elem_type
-        op1 = expression.dict["op1"]
-        op2 = expression.dict["op2"]
-        op1_val = self.evaluate_expression(op1)
-        op2_val = self.evaluate_expression(op2)
+    def eval_not(self, function, arg, stack):
+        op1_val = stack.pop()
+        if not type(op1_val) == bool:
+            super().error(
+                ErrorType.TYPE_ERROR,
+                "Incompatible type for logical NOT operator",
+            )
+        stack.append(not op1_val)
 
+    def eval_binary_op(self, op_type, op1_val, op2_val):
         # for + handle integer addition or string concatenation
-        if op_type == "+":
+        if op_type == ADD:
             if (type(op1_val) == int and type(op2_val) == int) or (
                 type(op1_val) == str and type(op2_val) == str
             ):
@@ -272,35 +1284,35 @@ class Interpreter(InterpreterBase):
                     "Incompatible types for addition operation",
                 )
 
-        elif op_type in { "-", "*", "/", "<", "<=", ">", ">=" }:
+        elif op_type in { SUB, MUL, DIV, LT, LE, GT, GE }:
             if not (type(op1_val) == int and type(op2_val) == int):
                 super().error(
                     ErrorType.TYPE_ERROR,
                     "Incompatible types for binary operator. Expected 2 integers",
-                ) 
-            if op_type == "-": return op1_val - op2_val
-            elif op_type == "*": return op1_val * op2_val
-            elif op_type == "/": return op1_val // op2_val
-            elif op_type == "<": return op1_val < op2_val
-            elif op_type == "<=": return op1_val <= op2_val
-            elif op_type == ">": return op1_val > op2_val
-            elif op_type == ">=": return op1_val >= op2_val
-        
-        elif op_type in { "==", "!=" }:
+                )
+            if op_type == SUB: return op1_val - op2_val
+            elif op_type == MUL: return op1_val * op2_val
+            elif op_type == DIV: return op1_val // op2_val
+            elif op_type == LT: return op1_val < op2_val
+            elif op_type == LE: return op1_val <= op2_val
+            elif op_type == GT: return op1_val > op2_val
+            elif op_type == GE: return op1_val >= op2_val
+
+        elif op_type in { EQ, NE }:
             # compare both type and value
             equal_types = False
             if type(op1_val) == type(op2_val):
                 equal_types = True
             if not equal_types:
-                return op_type == "!="
+                return op_type == NE
             equal_values = op1_val == op2_val
-            return equal_values if op_type == "==" else not equal_values
-        
-        elif op_type in { "&&", "||" }:
+            return equal_values if op_type == EQ else not equal_values
+
+        elif op_type in { AND, OR }:
             if not (type(op1_val) == bool and type(op2_val) == bool):
                 super().error(
                     ErrorType.TYPE_ERROR,
                     "Incompatible types for logical operation",
                 )
-            if op_type == "&&": return op1_val and op2_val
-            elif op_type == "||": return op1_val or op2_val
\ No newline at end of file
+            if op_type == AND: return op1_val and op2_val
+            elif op_type == OR: return op1_val or op2_val
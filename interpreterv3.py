@@ -1,5 +1,6 @@
 from intbase import InterpreterBase, ErrorType
 from brewparse import parse_program
+from element import Element
 import enum
 
 
@@ -11,8 +12,38 @@ class Type(enum.Enum):
     OBJECT = 4
     VOID = 5
 
+    # members are singletons, so identity hashing is enough and avoids Enum's
+    # python level __hash__ when types are used in dict keys
+    __hash__ = object.__hash__
+
+
+# type of a variable or function given the last letter of its name
+SUFFIX_TYPES = {
+    'i': Type.INT,
+    's': Type.STRING,
+    'b': Type.BOOL,
+    'o': Type.OBJECT,
+    'v': Type.VOID,
+}
+
+# dotted names split into their parts, None for plain names
+NAME_PARTS = {}
+
+
+def get_name_parts(name):
+    parts = NAME_PARTS.get(name, False)
+    if parts is False:
+        parts = tuple(name.split('.')) if '.' in name else None
+        NAME_PARTS[name] = parts
+    return parts
+
+# default for single-probe dict lookups, never stored as a value
+MISSING = object()
+
 
 class Value:
+    __slots__ = ("t", "v")
+
     def __init__(self, t=None, v=None):
         if t is None:
             self.t = Type.NIL
@@ -22,14 +53,47 @@ class Value:
             self.v = v
 
 
+# values are never modified after creation, so the common ones are shared
+V_UNSET = Value() # no value yet, e.g. a function without a return value
+V_TRUE = Value(Type.BOOL, True)
+V_FALSE = Value(Type.BOOL, False)
+V_ZERO = Value(Type.INT, 0)
+V_EMPTY_STRING = Value(Type.STRING, "")
+V_NIL = Value(Type.OBJECT, None)
+V_VOID = Value(Type.VOID, None)
+
+
+# (operator, left type, right type) -> function of the two raw values giving the result
+BINARY_OPS = {
+    ("+", Type.STRING, Type.STRING): lambda l, r: Value(Type.STRING, l + r),
+    ("+", Type.INT, Type.INT): lambda l, r: Value(Type.INT, l + r),
+    ("-", Type.INT, Type.INT): lambda l, r: Value(Type.INT, l - r),
+    ("*", Type.INT, Type.INT): lambda l, r: Value(Type.INT, l * r),
+    ("/", Type.INT, Type.INT): lambda l, r: Value(Type.INT, l // r),
+    ("<", Type.INT, Type.INT): lambda l, r: V_TRUE if l < r else V_FALSE,
+    ("<=", Type.INT, Type.INT): lambda l, r: V_TRUE if l <= r else V_FALSE,
+    (">", Type.INT, Type.INT): lambda l, r: V_TRUE if l > r else V_FALSE,
+    (">=", Type.INT, Type.INT): lambda l, r: V_TRUE if l >= r else V_FALSE,
+    ("&&", Type.BOOL, Type.BOOL): lambda l, r: V_TRUE if l and r else V_FALSE,
+    ("||", Type.BOOL, Type.BOOL): lambda l, r: V_TRUE if l or r else V_FALSE,
+}
+
+
 class BrewinObject:
+    __slots__ = ("fields",)
+
     def __init__(self):
         self.fields = {}
 
     def get_field(self, key):
-        if key not in self.fields:
+        value = self.fields.get(key, MISSING)
+        if value is MISSING:
             super().error(ErrorType.NAME_ERROR, f"field {key} not found")
-        return self.fields[key]
+        return value
+
+    def find_field(self, key):
+        """Field value, or MISSING if there is no such field"""
+        return self.fields.get(key, MISSING)
     
     def set_field(self, key, value):
         self.fields[key] = value
@@ -39,113 +103,178 @@ class BrewinObject:
 
 
 class Reference:
-    def __init__(self, env, var_name):
-        self.env = env
+    __slots__ = ("frame", "var_name", "parts")
+
+    def __init__(self, frame, var_name):
+        self.frame = frame # blocks of the caller's function where the variable lives
         self.var_name = var_name
+        self.parts = get_name_parts(var_name)
     
     def get(self):
-        if '.' not in self.var_name:
-            return self.env.get(self.var_name)
+        parts = self.parts
+        if parts is None:
+            return self.__get_var(self.var_name)
         else:
             # handle objects too 
-            parts = self.var_name.split('.')
-            curr = self.env.get(parts[0])
+            curr = self.__get_var(parts[0])
             for p in parts[1:]:
                 if curr.t != Type.OBJECT or curr.v is None:
                     return None
-                if not curr.v.has_field(p):
+                curr = curr.v.find_field(p)
+                if curr is MISSING:
                     return None
-                curr = curr.v.get_field(p)
             return curr
     
     def set(self, value):
-        if '.' not in self.var_name:
-            self.env.set(self.var_name, value)
+        parts = self.parts
+        if parts is None:
+            self.__set_var(self.var_name, value)
         else:
             # handle objects too
-            parts = self.var_name.split('.')
-            curr = self.env.get(parts[0])
+            curr = self.__get_var(parts[0])
             for p in parts[1:-1]:
                 curr = curr.v.get_field(p)
             curr.v.set_field(parts[-1], value)
 
+    def __get_var(self, varname):
+        for block in reversed(self.frame):
+            val = block.get(varname, MISSING)
+            if val is not MISSING:
+                # the caller's variable may itself be a reference
+                if val.__class__ is Reference:
+                    return val.get()
+                return val
+        return None
+
+    def __set_var(self, varname, value):
+        for block in reversed(self.frame):
+            val = block.get(varname, MISSING)
+            if val is not MISSING:
+                if val.__class__ is Reference:
+                    val.set(value)
+                else:
+                    block[varname] = value
+                return
+
 
 class Environment:
     def __init__(self):
         self.env = []
+        self.top = None # blocks of the running function, same as self.env[-1]
 
     def enter_block(self):
-        self.env[-1].append({})
+        self.top.append({})
 
     def exit_block(self):
-        self.env[-1].pop()
+        self.top.pop()
 
     def enter_func(self):
-        self.env.append([{}])
+        self.top = [{}]
+        self.env.append(self.top)
 
     def exit_func(self):
         self.env.pop()
+        self.top = self.env[-1] if self.env else None
 
     # define new variable at function scope
-    def fdef(self, varname):
+    def fdef(self, varname, value=V_UNSET):
         if self.exists(varname):
             return False
-        top_env = self.env[-1]
-        top_env[0][varname] = Value()
+        self.top[0][varname] = value
         return True
 
     # define new variable at block scope
-    def bdef(self, varname):
+    def bdef(self, varname, value=V_UNSET):
         if self.exists(varname):
             return False
-        top_env = self.env[-1]
-        top_env[-1][varname] = Value() # add to current block
+        self.top[-1][varname] = value # add to current block
         return True
 
+    # a name lives in one block only, so blocks are searched innermost first
     def exists(self, varname):
-        for block in self.env[-1]:
+        for block in reversed(self.top):
             if varname in block:
                 return True
         return False
 
+    # MISSING if the name is not defined
     def get(self, varname):
-        top_env = self.env[-1]
-        for block in top_env:
-            if varname in block:
-                val = block[varname]
-
-                if type(val) == Reference:
+        for block in reversed(self.top):
+            val = block.get(varname, MISSING)
+            if val is not MISSING:
+                if val.__class__ is Reference:
                     return val.get()
                 return val
-        return None
+        return MISSING
 
     def set(self, varname, value):
-        if not self.exists(varname):
-            return False
-        top_env = self.env[-1]
-        for block in top_env:
-            if varname in block:
-                val = block[varname]
-
-                if type(val) == Reference:
+        for block in reversed(self.top):
+            val = block.get(varname, MISSING)
+            if val is not MISSING:
+                if val.__class__ is Reference:
                     val.set(value)
                 else:
                     block[varname] = value
                 return True
-        return True
+        return False
 
 
 class Interpreter(InterpreterBase):
+    # default value of each declarable type
+    DEFAULT_VALUES = {
+        Type.INT: V_ZERO,
+        Type.STRING: V_EMPTY_STRING,
+        Type.BOOL: V_FALSE,
+        Type.OBJECT: V_NIL, # nil
+        Type.VOID: V_VOID, # void
+    }
+
     def __init__(self, console_output=True, inp=None, trace_output=False):
         super().__init__(console_output, inp)
-        self.funcs = {}
+        self.funcs = {} # name -> {parameter types -> function}
         self.env = Environment()
         self.bops = {"+", "-", "*", "/", "==", "!=", ">", ">=", "<", "<=", "||", "&&"}
+        self.type_cache = {} # name -> Type from its suffix, names repeat heavily
+
+        self.ret_value = V_UNSET # value of the last return statement executed
+
+        # statement kind -> handler; if, while and return handlers give back True on return
+        self.stmt_dispatch = {
+            self.VAR_DEF_NODE: self.__run_vardef,
+            self.BVAR_DEF_NODE: self.__run_bvardef,
+            "=": self.__run_assign,
+            self.FCALL_NODE: self.__run_fcall_statement,
+            self.IF_NODE: self.__run_if,
+            self.WHILE_NODE: self.__run_while,
+            self.RETURN_NODE: self.__run_return,
+        }
+        self.expr_dispatch = {
+            self.INT_NODE: self.__eval_literal,
+            self.STRING_NODE: self.__eval_literal,
+            self.BOOL_NODE: self.__eval_literal,
+            self.NIL_NODE: self.__eval_nil,
+            self.QUALIFIED_NAME_NODE: self.__eval_qname,
+            self.FCALL_NODE: self.__run_fcall,
+            self.NEG_NODE: self.__eval_neg,
+            self.NOT_NODE: self.__eval_not,
+            self.CONVERT_NODE: self.__eval_convert,
+            self.EMPTY_OBJ_NODE: self.__eval_empty_obj,
+        }
+        for op in self.bops:
+            self.expr_dispatch[op] = self.__eval_bop
 
     def run(self, program):
         ast = parse_program(program)
         self.__create_function_table(ast)
-        self.__run_fcall(self.__get_function("main"))
+        for overloads in self.funcs.values():
+            for func in overloads.values():
+                func.formals = [(arg.get("name"), arg.get("ref")) for arg in func.get("args")]
+                # the suffix was already checked when the function table was built
+                func.ret_type = self.__get_type_from_suffix(func.get("name"))
+                func.ops = self.__lower_statements(func.get("statements"))
+        main_call = Element(self.FCALL_NODE, name="main", args=[])
+        self.__resolve_expr(main_call)
+        self.__run_fcall(main_call)
 
     def __create_function_table(self, ast):
         """Allow multiple functions but different parameter type signatures"""
@@ -169,57 +298,128 @@ class Interpreter(InterpreterBase):
                     super().error(ErrorType.TYPE_ERROR, "formal parameters cannot be VOID type")
 
             # prevent duplicates
-            if (func_name, arg_types) in self.funcs:
+            overloads = self.funcs.setdefault(func_name, {})
+            if arg_types in overloads:
                 super().error(ErrorType.NAME_ERROR, f"{func_name} already exists. Duplicate functions not allowed")
-            self.funcs[(func_name, arg_types)] = func
+            overloads[arg_types] = func
 
-    def __get_function(self, name, arg_types=()):
-        if (name, arg_types) not in self.funcs:
-            super().error(ErrorType.NAME_ERROR, "function not found")
-        return self.funcs[(name, arg_types)]
-
-    def __run_vardef(self, statement):
-        name = statement.get("name")
+    def __lower_statements(self, statements):
+        """Flatten statements into (handler, statement) ops, noting what each name gives away"""
+        ops = []
+        for statement in statements:
+            kind = statement.elem_type
+            handler = self.stmt_dispatch.get(kind)
+            if handler is not None:
+                ops.append((handler, statement))
+
+            if kind == self.VAR_DEF_NODE or kind == self.BVAR_DEF_NODE or kind == "=":
+                name = statement.get("name") if kind != "=" else statement.get("var")
+                statement.var_name = name
+                # an invalid suffix is only reported if the statement runs
+                statement.var_type = SUFFIX_TYPES.get(name[-1])
+                statement.name_parts = get_name_parts(name)
+                if kind != "=":
+                    # VOID and invalid suffixes get no default and are reported when run
+                    statement.default_value = (
+                        self.DEFAULT_VALUES.get(statement.var_type)
+                        if statement.var_type is not Type.VOID
+                        else None
+                    )
+                else:
+                    statement.expression = self.__resolve_expr(statement.get("expression"))
+            elif kind == self.FCALL_NODE:
+                self.__resolve_expr(statement)
+            elif kind == self.IF_NODE:
+                statement.condition = self.__resolve_expr(statement.get("condition"))
+                statement.body_ops = self.__lower_statements(statement.get("statements"))
+                statement.else_ops = self.__lower_statements(statement.get("else_statements") or [])
+            elif kind == self.WHILE_NODE:
+                statement.condition = self.__resolve_expr(statement.get("condition"))
+                statement.body_ops = self.__lower_statements(statement.get("statements"))
+            elif kind == self.RETURN_NODE:
+                expr = statement.get("expression")
+                statement.expression = self.__resolve_expr(expr) if expr else None
+        return ops
 
-        var_type = self.__get_type_from_suffix(name)
+    def __resolve_expr(self, expr):
+        """Copy the parts of an expression tree its evaluator reads onto the nodes"""
+        kind = expr.elem_type
+        if kind == self.INT_NODE:
+            expr.cached_value = Value(Type.INT, expr.get("val"))
+        elif kind == self.STRING_NODE:
+            expr.cached_value = Value(Type.STRING, expr.get("val"))
+        elif kind == self.BOOL_NODE:
+            expr.cached_value = V_TRUE if expr.get("val") else V_FALSE
+        elif kind == self.QUALIFIED_NAME_NODE:
+            expr.var_name = expr.get("name")
+            expr.name_parts = get_name_parts(expr.var_name)
+        elif kind == self.FCALL_NODE:
+            expr.fcall_name = expr.get("name")
+            expr.args = expr.get("args")
+            for arg in expr.args:
+                self.__resolve_expr(arg)
+        elif kind == self.NEG_NODE or kind == self.NOT_NODE:
+            expr.op1 = self.__resolve_expr(expr.get("op1"))
+        elif kind == self.CONVERT_NODE:
+            expr.to_type = expr.get("to_type")
+            expr.operand = self.__resolve_expr(expr.get("expr"))
+        elif kind in self.bops:
+            expr.op1 = self.__resolve_expr(expr.get("op1"))
+            expr.op2 = self.__resolve_expr(expr.get("op2"))
+        return expr
 
-        if var_type == Type.VOID:
-            super().error(ErrorType.TYPE_ERROR, "variable cannot be VOID type")
+    def __get_function(self, name, arg_types=()):
+        overloads = self.funcs.get(name)
+        if overloads is not None:
+            if len(overloads) == 1:
+                # comparing with the only signature avoids hashing the types
+                for signature, func in overloads.items():
+                    if signature == arg_types:
+                        return func
+            else:
+                func = overloads.get(arg_types)
+                if func is not None:
+                    return func
+        super().error(ErrorType.NAME_ERROR, "function not found")
 
-        if not self.env.fdef(name):
-            super().error(ErrorType.NAME_ERROR, "variable already defined")
+    def __run_vardef(self, statement):
+        name = statement.var_name
 
         # initialize variable with default value for its type
-        default_val = self.__get_default_value(var_type)
-        self.env.set(name, default_val)
+        default_val = statement.default_value or self.__get_declared_default(statement)
+        if not self.env.fdef(name, default_val):
+            super().error(ErrorType.NAME_ERROR, "variable already defined")
 
     def __run_bvardef(self, statement):
-        name = statement.get("name")
+        name = statement.var_name
 
-        var_type = self.__get_type_from_suffix(name)
+        # initialize variable at block scope with default value for its type
+        default_val = statement.default_value or self.__get_declared_default(statement)
+        if not self.env.bdef(name, default_val):
+            super().error(ErrorType.NAME_ERROR, "variable already defined")
+
+    def __get_declared_default(self, statement):
+        """Raise the error a declaration without a precomputed default deserves"""
+        var_type = statement.var_type or self.__get_type_from_suffix(statement.var_name)
 
         if var_type == Type.VOID:
             super().error(ErrorType.TYPE_ERROR, "variable cannot be VOID type")
-            
-        if not self.env.bdef(name):
-            super().error(ErrorType.NAME_ERROR, "variable already defined")
 
-        # initialize variable at block scope with default value for its type
-        default_val = self.__get_default_value(var_type)
-        self.env.set(name, default_val)
+        return self.__get_default_value(var_type)
 
     def __run_assign(self, statement):
-        name = statement.get("var")
+        name = statement.var_name
 
         # regular values
-        if '.' not in name:
-            type = self.__get_type_from_suffix(name)
-            value = self.__eval_expr(statement.get("expression"))
-            self.__validate_type(type, value)
+        if statement.name_parts is None:
+            type = statement.var_type or self.__get_type_from_suffix(name)
+            value = self.__eval_expr(statement.expression)
+            if value.t is not type:
+                super().error(ErrorType.TYPE_ERROR, "incorrect type, types are mismatched.")
             if not self.env.set(name, value):
                 super().error(ErrorType.NAME_ERROR, "variable not defined")
         else: # object field assignment
-            self.__assign_dotted(name, statement.get("expression"))
+            self.__assign_dotted(name, statement.expression)
 
     def __handle_input(self, fcall_name, args):
         """Handle inputi and inputs function calls"""
@@ -250,10 +450,10 @@ class Interpreter(InterpreterBase):
 
         super().output(out)
 
-        return Value(Type.VOID, None)
+        return V_VOID
 
     def __run_fcall(self, func_call_ast):
-        fcall_name, args = func_call_ast.get("name"), func_call_ast.get("args")
+        fcall_name, args = func_call_ast.fcall_name, func_call_ast.args
 
         if fcall_name == "inputi" or fcall_name == "inputs":
             return self.__handle_input(fcall_name, args)
@@ -264,69 +464,63 @@ class Interpreter(InterpreterBase):
         actual_args = [self.__eval_expr(a) for a in args]
         arg_types = tuple(arg.t for arg in actual_args)
         
+        # reference arguments are evaluated too, their types pick the overload
         func_def = self.__get_function(fcall_name, arg_types)
-        formal_arg_nodes = func_def.get("args")
 
+        # references resolve against the caller's blocks
+        caller_frame = self.env.top
         self.env.enter_func()
+        # the new function has a single empty block, so parameters go straight into it
+        params = self.env.top[0]
         
         # support pass by ref and pass by val
-        for i, (formal_node, actual_val) in enumerate(zip(formal_arg_nodes, actual_args)):
-            formal_name = formal_node.get("name")
-            is_ref = formal_node.get("ref")
-            
-            self.env.fdef(formal_name)
-            
+        for i, (formal_name, is_ref) in enumerate(func_def.formals):
             if is_ref:
                 arg_expr = args[i]
                 if arg_expr.elem_type == 'qname':
-                    var_name = arg_expr.get('name')
+                    var_name = arg_expr.var_name
                     # point to caller's scope
-                    caller_env = Environment()
-                    caller_env.env = self.env.env[:-1]
-                    
-                    top_env = self.env.env[-1]
-                    top_env[0][formal_name] = Reference(caller_env, var_name)
+                    params[formal_name] = Reference(caller_frame, var_name)
                 else:
                     super().error(ErrorType.TYPE_ERROR, "not valid reference parameter")
             else:  # pass by val
-                self.env.set(formal_name, actual_val)
+                # a repeated parameter name writes through an earlier reference
+                earlier = params.get(formal_name)
+                if earlier.__class__ is Reference:
+                    earlier.set(actual_args[i])
+                else:
+                    params[formal_name] = actual_args[i]
         
-        res, _ = self.__run_statements(func_def.get("statements"))
+        # read the slot right away, before another call's return overwrites it
+        res = self.ret_value if self.__run_statements(func_def.ops) else V_UNSET
         self.env.exit_func()
 
         # return default value for the declared return type
-        func_ret_type = self.__get_type_from_suffix(fcall_name)
-        if res.t == Type.NIL:
+        func_ret_type = func_def.ret_type
+        if res.t is Type.NIL:
             res = self.__get_default_value(func_ret_type)
-        else: # check consistency with types
-            self.__validate_type(func_ret_type, res)
+        elif res.t is not func_ret_type: # check consistency with types
+            super().error(ErrorType.TYPE_ERROR, "incorrect type, types are mismatched.")
 
         return res
 
     def __run_if(self, statement):
-        cond = self.__eval_expr(statement.get("condition"))
+        cond = self.__eval_expr(statement.condition)
 
         if cond.t != Type.BOOL:
             super().error(ErrorType.TYPE_ERROR, "condition must be boolean")
 
         self.env.enter_block()
 
-        res, ret = Value(), False
-
-        if cond.v:
-            res, ret = self.__run_statements(statement.get("statements"))
-        elif statement.get("else_statements"):
-            res, ret = self.__run_statements(statement.get("else_statements"))
+        ret = self.__run_statements(statement.body_ops if cond.v else statement.else_ops)
 
         self.env.exit_block()
 
-        return res, ret
+        return ret
 
     def __run_while(self, statement):
-        res, ret = Value(), False
-
         while True:
-            cond = self.__eval_expr(statement.get("condition"))
+            cond = self.__eval_expr(statement.condition)
 
             if cond.t != Type.BOOL:
                 super().error(ErrorType.TYPE_ERROR, "condition must be boolean")
@@ -335,46 +529,29 @@ class Interpreter(InterpreterBase):
                 break
 
             self.env.enter_block()
-            res, ret = self.__run_statements(statement.get("statements"))
+            ret = self.__run_statements(statement.body_ops)
             self.env.exit_block()
             if ret:
-                break
+                return True
 
-        return res, ret
+        return False
 
     def __run_return(self, statement):
-        expr = statement.get("expression")
-        if expr:
-            return (self.__eval_expr(expr), True)
-        return (Value(), True)
-
-    def __run_statements(self, statements):
-        res, ret = Value(), False
+        expr = statement.expression
+        self.ret_value = self.__eval_expr(expr) if expr else V_UNSET
+        return True
 
-        for statement in statements:
-            kind = statement.elem_type
+    # True if a return statement ran; its value is left in self.ret_value
+    def __run_statements(self, ops):
+        for handler, statement in ops:
+            if handler(statement):
+                return True
 
-            if kind == self.VAR_DEF_NODE:
-                self.__run_vardef(statement)
-            elif kind == self.BVAR_DEF_NODE:
-                self.__run_bvardef(statement)
-            elif kind == "=":
-                self.__run_assign(statement)
-            elif kind == self.FCALL_NODE:
-                self.__run_fcall(statement)
-            elif kind == self.IF_NODE:
-                res, ret = self.__run_if(statement)
-                if ret:
-                    break
-            elif kind == self.WHILE_NODE:
-                res, ret = self.__run_while(statement)
-                if ret:
-                    break
-            elif kind == self.RETURN_NODE:
-                res, ret = self.__run_return(statement)
-                break
+        return False
 
-        return res, ret
+    def __run_fcall_statement(self, statement):
+        # the call's value is discarded
+        self.__run_fcall(statement)
 
     def __eval_binary_op(self, kind, vl, vr):
         """Evaluate binary operations"""
@@ -382,133 +559,90 @@ class Interpreter(InterpreterBase):
         vl_val, vr_val = vl.v, vr.v
 
         if kind == "==":
-            return Value(Type.BOOL, tl == tr and vl_val == vr_val)
+            return V_TRUE if tl == tr and vl_val == vr_val else V_FALSE
         if kind == "!=":
-            return Value(Type.BOOL, not (tl == tr and vl_val == vr_val))
-
-        if tl == Type.STRING and tr == Type.STRING:
-            if kind == "+":
-                return Value(Type.STRING, vl_val + vr_val)
-
-        if tl == Type.INT and tr == Type.INT:
-            if kind == "+":
-                return Value(Type.INT, vl_val + vr_val)
-            if kind == "-":
-                return Value(Type.INT, vl_val - vr_val)
-            if kind == "*":
-                return Value(Type.INT, vl_val * vr_val)
-            if kind == "/":
-                return Value(Type.INT, vl_val // vr_val)
-            if kind == "<":
-                return Value(Type.BOOL, vl_val < vr_val)
-            if kind == "<=":
-                return Value(Type.BOOL, vl_val <= vr_val)
-            if kind == ">":
-                return Value(Type.BOOL, vl_val > vr_val)
-            if kind == ">=":
-                return Value(Type.BOOL, vl_val >= vr_val)
-
-        if tl == Type.BOOL and tr == Type.BOOL:
-            if kind == "&&":
-                return Value(Type.BOOL, vl_val and vr_val)
-            if kind == "||":
-                return Value(Type.BOOL, vl_val or vr_val)
-
-        super().error(ErrorType.TYPE_ERROR, "invalid binary operation")
+            return V_FALSE if tl == tr and vl_val == vr_val else V_TRUE
 
-    def __eval_expr(self, expr):
-        kind = expr.elem_type
-
-        if kind == self.INT_NODE:
-            return Value(Type.INT, expr.get("val"))
+        operation = BINARY_OPS.get((kind, tl, tr))
+        if operation is None:
+            super().error(ErrorType.TYPE_ERROR, "invalid binary operation")
+        return operation(vl_val, vr_val)
 
-        if kind == self.STRING_NODE:
-            return Value(Type.STRING, expr.get("val"))
+    def __eval_expr(self, expr):
+        handler = self.expr_dispatch.get(expr.elem_type)
+        if handler is None:
+            raise Exception("should not get here!")
+        return handler(expr)
 
-        if kind == self.BOOL_NODE:
-            return Value(Type.BOOL, expr.get("val"))
+    # a literal always evaluates to the same Value, made once by __resolve_expr
+    def __eval_literal(self, expr):
+        return expr.cached_value
 
-        if kind == self.NIL_NODE:
-            return Value(Type.OBJECT, None)
+    def __eval_nil(self, expr):
+        return V_NIL
 
-        if kind == self.QUALIFIED_NAME_NODE:
-            var_name = expr.get("name")
+    def __eval_qname(self, expr):
+        var_name = expr.var_name
 
-            # dereference if dotted
-            if '.' in var_name:
-                return self.__eval_dotted_names(var_name)
-            
-            if not self.env.exists(var_name):
-                super().error(ErrorType.NAME_ERROR, "variable not defined")
-            return self.env.get(var_name)
+        # dereference if dotted
+        if expr.name_parts is not None:
+            return self.__eval_dotted_names(var_name)
+        
+        value = self.env.get(var_name)
+        if value is MISSING:
+            super().error(ErrorType.NAME_ERROR, "variable not defined")
+        return value
 
-        if kind == self.FCALL_NODE:
-            return self.__run_fcall(expr)
+    def __eval_bop(self, expr):
+        l, r = self.__eval_expr(expr.op1), self.__eval_expr(expr.op2)
+        return self.__eval_binary_op(expr.elem_type, l, r)
 
-        if kind in self.bops:
-            l, r = self.__eval_expr(expr.get("op1")), self.__eval_expr(expr.get("op2"))
-            return self.__eval_binary_op(kind, l, r)
+    def __eval_neg(self, expr):
+        o = self.__eval_expr(expr.op1)
+        if o.t == Type.INT:
+            return Value(Type.INT, -o.v)
 
-        if kind == self.NEG_NODE:
-            o = self.__eval_expr(expr.get("op1"))
-            if o.t == Type.INT:
-                return Value(Type.INT, -o.v)
+        super().error(ErrorType.TYPE_ERROR, "cannot negate non-integer")
 
-            super().error(ErrorType.TYPE_ERROR, "cannot negate non-integer")
+    def __eval_not(self, expr):
+        o = self.__eval_expr(expr.op1)
+        if o.t == Type.BOOL:
+            return V_FALSE if o.v else V_TRUE
 
-        if kind == self.NOT_NODE:
-            o = self.__eval_expr(expr.get("op1"))
-            if o.t == Type.BOOL:
-                return Value(Type.BOOL, not o.v)
+        super().error(ErrorType.TYPE_ERROR, "cannot apply NOT to non-boolean")
 
-            super().error(ErrorType.TYPE_ERROR, "cannot apply NOT to non-boolean")
+    def __eval_convert(self, expr):
+        to_type = expr.to_type
+        value = self.__eval_expr(expr.operand)
+        return self.__convert_value(value, to_type)
 
-        if kind == self.CONVERT_NODE:
-            to_type = expr.get("to_type")
-            value = self.__eval_expr(expr.get("expr"))
-            return self.__convert_value(value, to_type)
-        
+    def __eval_empty_obj(self, expr):
         # object creation
-        if kind == self.EMPTY_OBJ_NODE:
-            return Value(Type.OBJECT, BrewinObject())
-
-        raise Exception("should not get here!")
-    
+        return Value(Type.OBJECT, BrewinObject())
 
     def __get_type_from_suffix(self, name):
         """Get type from variable or function name suffix"""
+        type = self.type_cache.get(name)
+        if type is not None:
+            return type
 
         if name == "main":
-            return Type.VOID
-        
-        last = name[-1]
-        type_map = {
-            'i': Type.INT,
-            's': Type.STRING,
-            'b': Type.BOOL,
-            'o': Type.OBJECT,
-            'v': Type.VOID,
-        }
-
-        if last not in type_map:
-            super().error(ErrorType.TYPE_ERROR, "function name does not end with a valid type letter")
+            type = Type.VOID
+        else:
+            type = SUFFIX_TYPES.get(name[-1])
+            if type is None:
+                super().error(ErrorType.TYPE_ERROR, "function name does not end with a valid type letter")
 
-        return type_map[last]  
+        self.type_cache[name] = type
+        return type
 
     def __get_default_value(self, type):
         """Get default value based on declared return type""" 
-        default_map = {
-            Type.INT: Value(Type.INT, 0),
-            Type.STRING: Value(Type.STRING, ""),
-            Type.BOOL: Value(Type.BOOL, False),
-            Type.OBJECT: Value(Type.OBJECT, None), # nil
-            Type.VOID: Value(Type.VOID, None), # void
-        }
-
-        if type not in default_map:
+        value = self.DEFAULT_VALUES.get(type)
+        if value is None:
             super().error(ErrorType.TYPE_ERROR, "invalid type. Type does not have default value")
         
-        return default_map[type]
+        return value
 
     def __validate_type(self, type, value):
         """Check if value's type is the expected type"""
@@ -544,9 +678,9 @@ class Interpreter(InterpreterBase):
             if value.t == Type.BOOL:
                 return value
             elif value.t == Type.INT:
-                return Value(Type.BOOL, False if value.v == 0 else True)
+                return V_FALSE if value.v == 0 else V_TRUE
             elif value.t == Type.STRING:
-                return Value(Type.BOOL, False if value.v == "" else True)
+                return V_FALSE if value.v == "" else V_TRUE
             else:
                 super().error(ErrorType.TYPE_ERROR, "brewin objects cannot be converted into bools")
         
@@ -559,23 +693,11 @@ class Interpreter(InterpreterBase):
         Writing to a field must check all intermediate segments must 
         have been assigned to a valid object and be o-typed    
         """
-        parts = var_name.split('.')
+        parts = get_name_parts(var_name)
         value = self.__eval_expr(expr)
 
         # check validity from [root, final) field
-        if not self.env.exists(parts[0]):
-            super().error(ErrorType.NAME_ERROR, f"Object {parts[0]} not defined")
-        
-        curr = self.env.get(parts[0])
-        for p in parts[1:-1]:
-            if curr.t != Type.OBJECT:
-                super().error(ErrorType.TYPE_ERROR, "cannot access member on non-objects")
-            if curr.v is None:
-                super().error(ErrorType.FAULT_ERROR, "Accessing non-object type or dereferncing a nil object")
-            if not curr.v.has_field(p):
-                super().error(ErrorType.NAME_ERROR, "Field does not exist")
-
-            curr = curr.v.get_field(p)
+        curr = self.__walk_path(parts, len(parts) - 1)
         if curr.t != Type.OBJECT:
             super().error(ErrorType.TYPE_ERROR, "Cannot set field on non-member object")
         if curr.v is None:
@@ -589,22 +711,25 @@ class Interpreter(InterpreterBase):
         curr.v.set_field(final, value)
 
     def __eval_dotted_names(self, var_name):
-        parts = var_name.split('.')
-
         # check validity from [root, final] field
-        if not self.env.exists(parts[0]):
+        parts = get_name_parts(var_name)
+        return self.__walk_path(parts, len(parts))
+
+    def __walk_path(self, parts, end):
+        """Value reached by following parts[1:end] from the variable parts[0]"""
+        curr = self.env.get(parts[0])
+        if curr is MISSING:
             super().error(ErrorType.NAME_ERROR, f"Object {parts[0]} not defined")
         
-        curr = self.env.get(parts[0])
-        for p in parts[1:]:
-            if curr.t != Type.OBJECT:
+        for i in range(1, end):
+            t, obj = curr.t, curr.v
+            if t != Type.OBJECT:
                 super().error(ErrorType.TYPE_ERROR, "Cannot access non-object type")
-            if curr.v is None:
+            if obj is None:
                 super().error(ErrorType.FAULT_ERROR, "Accessing non-object type or dereferncing a nil object")
-            if not curr.v.has_field(p):
+            curr = obj.find_field(parts[i])
+            if curr is MISSING:
                 super().error(ErrorType.NAME_ERROR, "Field does not exist")
-
-            curr = curr.v.get_field(p)
     
         return curr
 
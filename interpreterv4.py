@@ -1,8 +1,8 @@
 from intbase import InterpreterBase, ErrorType
 from brewparse import parse_program
 from element import Element
-from copy import copy, deepcopy
 import enum
+import sys
 
 from debug_utils import debug_logger, debug_logger_with_return_val, debug, info
 
@@ -21,50 +21,183 @@ class Type(enum.Enum):
         if not var_name:
             return Type.ERROR
         last_letter = var_name[-1]
-        if last_letter == "i":
-            return Type.INT
-        if last_letter == "s":
-            return Type.STRING
-        if last_letter == "b":
-            return Type.BOOL
-        if last_letter == "o":
-            return Type.OBJECT
-        if last_letter == "v":
-            return Type.VOID  # only for functions
-        if last_letter == "f":
-            return Type.FUNCTION
+        var_type = SUFFIX_TYPES.get(last_letter)
+        if var_type is not None:
+            return var_type
         if last_letter.isupper():
             return Type.OBJECT # treat interfaces as objects at runtime
         return Type.ERROR
 
+    # members are singletons, so identity hashing is enough and avoids Enum's
+    # python level __hash__ when types are used in dict keys
+    __hash__ = object.__hash__
+
+
+BINARY_OPERATORS = frozenset(("+", "-", "*", "/", "==", "!=", ">", ">=", "<", "<=", "||", "&&"))
+
+# AST keys holding variable and function names, interned by prepare_ast
+NAME_KEYS = ("name", "var")
+
+# AST keys the tree walker reads on every visit, also set as attributes by prepare_ast
+OPERAND_KEYS = frozenset(("op1", "op2", "val", "expr"))
+
+
+def prepare_ast(node):
+    """
+    Intern node kinds and names across the AST. The parser slices names and
+    operators out of the source, so otherwise every occurrence is its own string;
+    interned ones let dict lookups and kind checks succeed on identity. Operands
+    and literal values are also copied onto their nodes as attributes, so reading
+    them skips Element.get.
+    """
+    if isinstance(node, list):
+        for item in node:
+            prepare_ast(item)
+    elif isinstance(node, Element):
+        node.elem_type = sys.intern(node.elem_type)
+        for key, value in node.dict.items():
+            if key in NAME_KEYS and isinstance(value, str):
+                value = node.dict[key] = sys.intern(value)
+            else:
+                prepare_ast(value)
+            if key in OPERAND_KEYS:
+                setattr(node, key, value)
+
+
+# types whose variables may hold nil
+NIL_TYPES = frozenset((Type.OBJECT, Type.FUNCTION))
+
+# last letter of a name -> its type
+SUFFIX_TYPES = {
+    "i": Type.INT,
+    "s": Type.STRING,
+    "b": Type.BOOL,
+    "o": Type.OBJECT,
+    "v": Type.VOID,  # only for functions
+    "f": Type.FUNCTION,
+}
+
+# type of a passed value -> its letter in a call's type signature
+TYPE_SIGNATURES = {
+    Type.INT: "i",
+    Type.STRING: "s",
+    Type.BOOL: "b",
+    Type.OBJECT: "o",
+    Type.FUNCTION: "f",
+}
+
+
+# (operator, left type, right type) -> function of the two raw values giving a new Value
+BINARY_OPS = {
+    ("+", Type.STRING, Type.STRING): lambda l, r: Value(Type.STRING, l + r),
+    ("+", Type.INT, Type.INT): lambda l, r: Value(Type.INT, l + r),
+    ("-", Type.INT, Type.INT): lambda l, r: Value(Type.INT, l - r),
+    ("*", Type.INT, Type.INT): lambda l, r: Value(Type.INT, l * r),
+    ("/", Type.INT, Type.INT): lambda l, r: Value(Type.INT, l // r),
+    ("<", Type.INT, Type.INT): lambda l, r: Value(Type.BOOL, l < r),
+    ("<=", Type.INT, Type.INT): lambda l, r: Value(Type.BOOL, l <= r),
+    (">", Type.INT, Type.INT): lambda l, r: Value(Type.BOOL, l > r),
+    (">=", Type.INT, Type.INT): lambda l, r: Value(Type.BOOL, l >= r),
+    ("&&", Type.BOOL, Type.BOOL): lambda l, r: Value(Type.BOOL, l and r),
+    ("||", Type.BOOL, Type.BOOL): lambda l, r: Value(Type.BOOL, l or r),
+}
+
+
+# operators generated inline for two ints -> (result type, Python operator);
+# any other pair of operands goes through the interpreter's checks
+INT_OPERATORS = {
+    "+": (Type.INT, "+"),
+    "-": (Type.INT, "-"),
+    "*": (Type.INT, "*"),
+    "/": (Type.INT, "//"),
+    "<": (Type.BOOL, "<"),
+    "<=": (Type.BOOL, "<="),
+    ">": (Type.BOOL, ">"),
+    ">=": (Type.BOOL, ">="),
+    "==": (Type.BOOL, "=="),
+    "!=": (Type.BOOL, "!="),
+}
+
+
+def string_to_int(o):
+    try:
+        return Value(Type.INT, int(o.v))
+    except ValueError:
+        return None # reported by the interpreter
+
+
+# (target type, value's type) -> function of the Value giving the converted Value,
+# or None when a string does not hold an int; converting to the same type gives
+# back the same Value
+CONVERSIONS = {
+    ("int", Type.INT): lambda o: o,
+    ("int", Type.STRING): string_to_int,
+    ("int", Type.BOOL): lambda o: Value(Type.INT, 1 if o.v else 0),
+    ("str", Type.STRING): lambda o: o,
+    ("str", Type.INT): lambda o: Value(Type.STRING, str(o.v)),
+    ("str", Type.BOOL): lambda o: Value(Type.STRING, str(o.v).lower()),
+    ("bool", Type.BOOL): lambda o: o,
+    ("bool", Type.INT): lambda o: Value(Type.BOOL, o.v != 0),
+    ("bool", Type.STRING): lambda o: Value(Type.BOOL, o.v != ""),
+}
+
+# target type -> error for values of any other type (objects, functions)
+CONVERSION_ERRORS = {
+    "int": "cannot convert object to int",
+    "str": "cannot convert object to string",
+    "bool": "cannot convert object to bool",
+}
+
+
+# dotted names split into their parts; the same names are looked up over and over
+NAME_PARTS = {}
+
+
+def split_name(name):
+    parts = NAME_PARTS.get(name)
+    if parts is None:
+        parts = NAME_PARTS[name] = tuple(name.split("."))
+    return parts
+
+
+def needs_block(*bodies):
+    """
+    Whether running these statements needs a block scope of its own. Only a bvar
+    declared directly in them lands in that block (nested ifs and whiles push their
+    own), so a body without one would leave it empty and lookups see the same names.
+    """
+    return any(
+        statement.elem_type == InterpreterBase.BVAR_DEF_NODE
+        for body in bodies if body
+        for statement in body
+    )
+
 
 class Value:
+    __slots__ = ("t", "v")
+
     def __init__(self, t, v=None):
-        if v is None:
-            self.t = t
-            self.v = self.__default_value_for_type(t)
-        else:
-            self.t = t
-            self.v = v
+        self.t = t
+        self.v = v if v is not None else self.__default_value_for_type(t)
 
     def set(self, other):
         self.t = other.t
         self.v = other.v
 
     def __default_value_for_type(self, t):
-        if t == Type.INT:
+        if t is Type.INT:
             return 0
-        if t == Type.STRING:
+        if t is Type.STRING:
             return ""
-        elif t == Type.BOOL:
+        elif t is Type.BOOL:
             return False
-        elif t == Type.OBJECT:
+        elif t is Type.OBJECT:
             return (
                 None  # representing Nil as an object type value with None as its value
             )
-        elif t == Type.FUNCTION:
+        elif t is Type.FUNCTION:
             return None # representing Nil
-        elif t == Type.VOID:
+        elif t is Type.VOID:
             return None
 
         raise Exception("invalid default value for type")
@@ -73,55 +206,63 @@ class Value:
 class Environment:
     def __init__(self):
         self.env = []
+        self.top = None # blocks of the running function, same as self.env[-1]
 
     def enter_block(self):
-        self.env[-1].append({})
+        self.top.append({})
 
     def exit_block(self):
-        self.env[-1].pop()
+        self.top.pop()
 
     def enter_func(self):
-        self.env.append([{}])
+        self.top = [{}]
+        self.env.append(self.top)
 
     def exit_func(self):
         self.env.pop()
+        self.top = self.env[-1] if self.env else None
+
+    def in_func(self):
+        return self.top is not None
 
     # define new variable at function scope
     def fdef(self, varname, value):
-        top_env = self.env[-1]
+        func_block = self.top[0]
         # differentiate from block scope
-        if varname in top_env[0]:
+        if varname in func_block:
             return False
-        top_env[0][varname] = value
+        func_block[varname] = value
         return True
 
     # define new variable in top block
     def bdef(self, varname, value):
         # allow shadowing in block scope
-        top_env = self.env[-1]
-        if varname in top_env[-1]:
+        top_block = self.top[-1]
+        if varname in top_block:
             return False        
-        top_env[-1][varname] = value
+        top_block[varname] = value
         return True
 
     def exists(self, varname):
-        for block in self.env[-1]:
+        for block in self.top:
             if varname in block:
                 return True
         return False
 
     def get(self, varname):
-        top_env = self.env[-1]
-        for block in reversed(top_env):
-            if varname in block:
-                return block[varname]
+        # variables (and object fields) always hold a Value, so a dict's get() giving
+        # None means the name is missing; lookups throughout rely on this
+        top = self.top
+        if len(top) == 1:
+            return top[0].get(varname)
+        for block in reversed(top):
+            value = block.get(varname)
+            if value is not None:
+                return value
         return None
 
     def set(self, varname, value):
-        if not self.exists(varname):
-            return False
-        top_env = self.env[-1]
-        for block in reversed(top_env):
+        for block in reversed(self.top):
             if varname in block:
                 block[varname] = value
                 return True
@@ -129,18 +270,39 @@ class Environment:
     
     def capture_vars(self):
         """Capture all variables in scope for lambda implementation"""
+        # primitives are captured by value; objects and functions keep pointing at
+        # the same object, but a fresh Value prevents reassigning the outer variable
         captured = {}
-        for block in self.env[-1]:
+        for block in reversed(self.top):
             for name, val in block.items():
-                captured[name] = val
+                # inner blocks are seen first and shadow outer ones
+                if name not in captured:
+                    captured[name] = Value(val.t, val.v)
         return captured
 
 class Function:
+    __slots__ = (
+        "return_type",
+        "formal_args",
+        "formal_params",
+        "statements",
+        "interface_matches",
+        "compiled",
+    )
+
     def __init__(self, func_ast):
         self.return_type = self.__get_return_type(func_ast)
         # the args in the ast is a list of qualified name nodes
         self.formal_args = {a.get("name"): a.get("ref") for a in func_ast.get("args")}
+        # (name, is ref, type, interface name or None) per parameter, read on every call
+        self.formal_params = tuple(
+            (name, ref, Type.get_type(name), name[-1] if name[-1].isupper() else None)
+            for name, ref in self.formal_args.items()
+        )
         self.statements = func_ast.get("statements")
+        # (interface name, field name) -> whether the signatures match; never changes
+        self.interface_matches = {}
+        self.compiled = None # Python version of the body, see FunctionCompiler
 
     def __get_return_type(self, func_ast):
         name = func_ast.get("name")
@@ -152,12 +314,16 @@ class Function:
 
 # Inherits from Function with added captured variables
 class Lambda(Function):
+    __slots__ = ("captured_vars",)
+
     def __init__(self, lambda_ast, captured_vars):
         super().__init__(lambda_ast)
         self.captured_vars = captured_vars
 
 
 class Interface:
+    __slots__ = ("name", "field_vars", "field_funcs", "var_checks", "func_checks")
+
     def __init__(self, name, fields):
         self.name = name
         self.field_vars = {}
@@ -165,6 +331,10 @@ class Interface:
 
         self.__assign_fields(fields)
 
+        # (name, expected) pairs walked by every satisfaction check
+        self.var_checks = tuple(self.field_vars.items())
+        self.func_checks = tuple(self.field_funcs.items())
+
     # @debug_logger_with_return_val
     def __assign_fields(self, fields):
         for field in fields:
@@ -185,57 +355,334 @@ class Interface:
                 self.field_funcs[func_name] = param_sig
 
 
+class FunctionCompiler:
+    """
+    Translates a function body into Python source once and compiles it, so
+    running the function skips the tree walker's per-node dispatch. Plain
+    variables, literals and operators are generated inline with the same checks
+    and errors; anything dynamic (calls, lambdas, dotted names, conversions) is
+    handed back to the interpreter through the helpers.
+    """
+
+    # helper name -> name it has inside the generated function
+    HELPERS = (
+        "env_get", "fdef", "bdef", "enter_block", "exit_block", "error",
+        "eval_expr", "run_fcall", "run_assign", "run_vardef",
+        "binary_op", "neg", "not_",
+    )
+
+    # literal kinds that hold an immutable Python value -> their type
+    SHARED_LITERALS = {
+        InterpreterBase.INT_NODE: Type.INT,
+        InterpreterBase.STRING_NODE: Type.STRING,
+        InterpreterBase.BOOL_NODE: Type.BOOL,
+        InterpreterBase.NIL_NODE: Type.OBJECT,
+    }
+
+    def __init__(self, func_names, helpers):
+        self.func_names = func_names # names that evaluate to function values
+        self.helpers = helpers
+
+    def compile(self, name, funcdef):
+        """
+        The compiled body, or None when Python cannot compile it: its limits on
+        nested blocks and indentation are lower than Brewin's, and such bodies
+        are left to the tree walker
+        """
+        try:
+            return self.__compile(name, funcdef)
+        except (SyntaxError, RecursionError):
+            return None
+
+    def __compile(self, name, funcdef):
+        self.lines = []
+        self.nodes = [] # AST nodes handed back to the interpreter, read as N[k]
+        self.consts = [] # literal Values shared by every run, read as K[k]
+        self.temps = 0
+        self.__statements(funcdef.statements, 1)
+        self.lines.append("    return None")
+
+        # bind globals to locals once per call
+        preamble = "    " + ", ".join(self.HELPERS) + ", N, K, RT = " + ", ".join(
+            name.upper() for name in self.HELPERS
+        ) + ", NODES, CONSTS, RETURN_TYPE"
+        src = "def body():\n" + preamble + "\n" + "\n".join(self.lines) + "\n"
+
+        namespace = {name.upper(): self.helpers[name] for name in self.HELPERS}
+        namespace.update(
+            Value=Value,
+            Type=Type,
+            INT=Type.INT,
+            BOOL=Type.BOOL,
+            ErrorType=ErrorType,
+            NIL_TYPES=NIL_TYPES,
+            NODES=self.nodes,
+            CONSTS=self.consts,
+            RETURN_TYPE=funcdef.return_type,
+        )
+        exec(compile(src, f"<brewin:{name}>", "exec"), namespace)
+        return namespace["body"]
+
+    def __emit(self, depth, line):
+        self.lines.append("    " * depth + line)
+
+    def __node(self, node):
+        self.nodes.append(node)
+        return f"N[{len(self.nodes) - 1}]"
+
+    def __const(self, value):
+        self.consts.append(value)
+        return f"K[{len(self.consts) - 1}]"
+
+    def __temp(self, prefix):
+        self.temps += 1
+        return f"{prefix}{self.temps}"
+
+    def __statements(self, statements, depth):
+        start = len(self.lines)
+        for statement in statements or []:
+            self.__statement(statement, depth)
+        if len(self.lines) == start:
+            self.__emit(depth, "pass")
+
+    def __statement(self, statement, depth):
+        kind = statement.elem_type
+
+        if kind == InterpreterBase.VAR_DEF_NODE or kind == InterpreterBase.BVAR_DEF_NODE:
+            block_def = kind == InterpreterBase.BVAR_DEF_NODE
+            name = statement.get("name")
+            var_type = Type.get_type(name)
+            if var_type is Type.ERROR or var_type is Type.VOID:
+                # let the interpreter report the bad type when it runs
+                self.__emit(depth, f"run_vardef({self.__node(statement)}, {block_def})")
+                return
+            define = "bdef" if block_def else "fdef"
+            self.__emit(depth, f"if not {define}({name!r}, Value(Type.{var_type.name})):")
+            self.__emit(depth + 1, 'error(ErrorType.NAME_ERROR, "variable already defined")')
+
+        elif kind == "=":
+            name = statement.get("var")
+            if "." in name or name[-1].isupper():
+                # dotted targets and interface checks stay in the interpreter
+                self.__emit(depth, f"run_assign({self.__node(statement)})")
+                return
+            var_type = Type.get_type(name)
+            r, l = self.__temp("r"), self.__temp("l")
+            # set() copies the type and value out, so a shared literal is safe
+            self.__emit(depth, f"{r} = {self.__expr(statement.get('expression'), True)}")
+            self.__emit(depth, f"{l} = env_get({name!r})")
+            self.__emit(depth, f"if {l} is None:")
+            self.__emit(depth + 1, 'error(ErrorType.NAME_ERROR, "variable not defined")')
+            # allow nil assignment to objects and function
+            if var_type in NIL_TYPES:
+                self.__emit(depth, f"if {r}.v is not None and {r}.t is not Type.{var_type.name}:")
+            else:
+                self.__emit(depth, f"if {r}.v is None or {r}.t is not Type.{var_type.name}:")
+            self.__emit(depth + 1, 'error(ErrorType.TYPE_ERROR, "type mismatch in assignment")')
+            self.__emit(depth, f"{l}.set({r})")
+
+        elif kind == InterpreterBase.FCALL_NODE:
+            self.__emit(depth, f"run_fcall({self.__node(statement)})")
+
+        elif kind == InterpreterBase.IF_NODE:
+            c = self.__temp("c")
+            block = needs_block(statement.get("statements"), statement.get("else_statements"))
+            self.__condition(c, statement, depth)
+            if block:
+                self.__emit(depth, "enter_block()")
+            self.__emit(depth, f"if {c}.v:")
+            self.__statements(statement.get("statements"), depth + 1)
+            if statement.get("else_statements"):
+                self.__emit(depth, "else:")
+                self.__statements(statement.get("else_statements"), depth + 1)
+            if block:
+                self.__emit(depth, "exit_block()")
+
+        elif kind == InterpreterBase.WHILE_NODE:
+            c = self.__temp("c")
+            self.__emit(depth, "while True:")
+            self.__condition(c, statement, depth + 1)
+            self.__emit(depth + 1, f"if not {c}.v:")
+            self.__emit(depth + 2, "break")
+            block = needs_block(statement.get("statements"))
+            if block:
+                self.__emit(depth + 1, "enter_block()")
+            self.__statements(statement.get("statements"), depth + 1)
+            if block:
+                self.__emit(depth + 1, "exit_block()")
+
+        elif kind == InterpreterBase.RETURN_NODE:
+            expr = statement.get("expression")
+            if not expr:
+                self.__emit(depth, "return Value(RT)")
+                return
+            r = self.__temp("r")
+            self.__emit(depth, f"{r} = {self.__expr(expr)}")
+            self.__emit(depth, f"if {r}.t is not RT:")
+            self.__emit(depth + 1, 'error(ErrorType.TYPE_ERROR, "return type mismatch")')
+            self.__emit(depth, f"return {r}")
+
+    def __condition(self, c, statement, depth):
+        self.__emit(depth, f"{c} = {self.__expr(statement.get('condition'), True)}")
+        self.__emit(depth, f"if {c}.t is not Type.BOOL:")
+        self.__emit(depth + 1, 'error(ErrorType.TYPE_ERROR, "condition must be boolean")')
+
+    def __expr(self, expr, shared=False):
+        """
+        Python expression for expr. With shared set, the caller only reads the
+        Value's type and value and never keeps it, so a primitive literal can be
+        one Value made at compile time; anywhere else (arguments, returns) it may
+        end up bound to a variable and changed, so each run needs its own.
+        """
+        kind = expr.elem_type
+
+        if shared and kind in self.SHARED_LITERALS:
+            return self.__const(Value(self.SHARED_LITERALS[kind], expr.get("val")))
+        if kind == InterpreterBase.NEG_NODE or kind == InterpreterBase.NOT_NODE:
+            folded = self.__fold_unary(expr)
+            if folded is not None:
+                return self.__expr(folded, shared)
+        if kind == InterpreterBase.INT_NODE:
+            return f"Value(Type.INT, {expr.get('val')!r})"
+        if kind == InterpreterBase.STRING_NODE:
+            return f"Value(Type.STRING, {expr.get('val')!r})"
+        if kind == InterpreterBase.BOOL_NODE:
+            return f"Value(Type.BOOL, {expr.get('val')!r})"
+        if kind == InterpreterBase.NIL_NODE:
+            return "Value(Type.OBJECT)"
+        if kind == InterpreterBase.EMPTY_OBJ_NODE:
+            return "Value(Type.OBJECT, {})"
+        if kind == InterpreterBase.QUALIFIED_NAME_NODE:
+            name = expr.get("name")
+            if "." not in name and name not in self.func_names:
+                return (
+                    f"(env_get({name!r}) or "
+                    f'error(ErrorType.NAME_ERROR, "variable not defined"))'
+                )
+        elif kind in BINARY_OPERATORS:
+            # operators read their operands and always build a new result
+            left, right = self.__expr(expr.get("op1"), True), self.__expr(expr.get("op2"), True)
+            if kind in INT_OPERATORS:
+                # evaluate both operands in order (& does not short-circuit), then
+                # compute directly when both are ints
+                result_type, op = INT_OPERATORS[kind]
+                a, b = self.__temp("a"), self.__temp("b")
+                return (
+                    f"(Value(Type.{result_type.name}, {a}.v {op} {b}.v) "
+                    f"if (({a} := {left}).t is INT) & (({b} := {right}).t is INT) "
+                    f"else binary_op({kind!r}, {a}, {b}))"
+                )
+            return f"binary_op({kind!r}, {left}, {right})"
+        elif kind == InterpreterBase.NEG_NODE:
+            a = self.__temp("a")
+            return (
+                f"(Value(Type.INT, -{a}.v) if ({a} := {self.__expr(expr.get('op1'), True)}).t is INT "
+                f"else neg({a}))"
+            )
+        elif kind == InterpreterBase.NOT_NODE:
+            a = self.__temp("a")
+            return (
+                f"(Value(Type.BOOL, not {a}.v) if ({a} := {self.__expr(expr.get('op1'), True)}).t is BOOL "
+                f"else not_({a}))"
+            )
+
+        return f"eval_expr({self.__node(expr)})"
+
+    def __fold_unary(self, expr):
+        """The literal for -5 or !true, or None when the operand is not a literal it fits"""
+        op = expr.get("op1")
+        if expr.elem_type == InterpreterBase.NEG_NODE and op.elem_type == InterpreterBase.INT_NODE:
+            return Element(InterpreterBase.INT_NODE, val=-op.get("val"))
+        if expr.elem_type == InterpreterBase.NOT_NODE and op.elem_type == InterpreterBase.BOOL_NODE:
+            return Element(InterpreterBase.BOOL_NODE, val=not op.get("val"))
+        return None
+
+
 class Interpreter(InterpreterBase):
     def __init__(self, console_output=True, inp=None, trace_output=False):
         super().__init__(console_output, inp)
         self.funcs = {}
+        self.funcs_by_name = {} # name -> its (name, signature) keys in self.funcs
         self.interfaces = {}
         self.env = Environment()
-        self.bops = {"+", "-", "*", "/", "==", "!=", ">", ">=", "<", "<=", "||", "&&"}
+
+        # the tree walker's tables, only used for bodies FunctionCompiler could not
+        # compile (see FunctionCompiler.compile)
+        # statement kind -> handler, for statements that never return from the function
+        self.stmt_dispatch = {
+            self.VAR_DEF_NODE: self.__run_vardef,
+            self.BVAR_DEF_NODE: self.__run_bvardef,
+            "=": self.__run_assign,
+            self.FCALL_NODE: self.__run_fcall,
+        }
+        # statement kind -> handler taking the funcdef and giving back (res, ret);
+        # res is only meaningful once ret is True
+        self.ctrl_dispatch = {
+            self.IF_NODE: self.__run_if,
+            self.WHILE_NODE: self.__run_while,
+            self.RETURN_NODE: self.__run_return,
+        }
+        # expression kind -> handler giving back its Value
+        self.expr_dispatch = {
+            self.INT_NODE: lambda e: Value(Type.INT, e.val),
+            self.STRING_NODE: lambda e: Value(Type.STRING, e.val),
+            self.BOOL_NODE: lambda e: Value(Type.BOOL, e.val),
+            self.NIL_NODE: lambda e: Value(Type.OBJECT),
+            self.EMPTY_OBJ_NODE: lambda e: Value(Type.OBJECT, {}),
+            self.QUALIFIED_NAME_NODE: self.__get_var_value,
+            self.FCALL_NODE: self.__run_fcall,
+            self.FUNC_NODE: self.__create_lambda, # lambda
+            self.NEG_NODE: lambda e: self.__eval_neg(self.eval_expr(e.op1)),
+            self.NOT_NODE: lambda e: self.__eval_not(self.eval_expr(e.op1)),
+            self.CONVERT_NODE: self.__eval_convert,
+        }
+        for kind in BINARY_OPERATORS:
+            self.expr_dispatch[kind] = self.__eval_binary_expr
 
     def run(self, program):
         ast = parse_program(program, plot=False)
+        prepare_ast(ast)
         self.__create_interface_table(ast)
         self.__create_function_table(ast)
+        self.__compile_functions()
         call_element = Element(InterpreterBase.FCALL_NODE, name="main", args=[])
         self.__run_fcall(call_element)
 
     def __get_parameters_type_signature(self, formal_params):
         # a formal arg is an Element of type ARG_NODE
-        param_type_sig = ""
-        for p in formal_params:
-            p_last = p.get("name")[-1]
-            # handle interface -> object type
-            if p_last.isupper():
-                param_type_sig += 'o'
-            else:
-                param_type_sig += p_last
+        # handle interface -> object type
+        param_type_sig = "".join(
+            "o" if p_last.isupper() else p_last
+            for p_last in (p.get("name")[-1] for p in formal_params)
+        )
         allowed = "biosf"
         if not all(c in allowed for c in param_type_sig):
             super().error(ErrorType.TYPE_ERROR, "invalid type in formal parameter")
         return param_type_sig
 
+    def __eval_args(self, args):
+        # most calls pass no argument or just one, which need no loop
+        if not args:
+            return ()
+        if len(args) == 1:
+            return (self.eval_expr(args[0]),)
+        return tuple(map(self.eval_expr, args))
+
     # @debug_logger_with_return_val
     def __get_arguments_type_signature(self, actual_args):
-        arg_sig = ""
+        try:
+            return "".join([TYPE_SIGNATURES[arg.t] for arg in actual_args])
+        except KeyError:
+            pass
+
+        # report the first argument without a signature letter
         for arg in actual_args:
-            if arg.t == Type.INT:
-                arg_sig += "i"
-            elif arg.t == Type.STRING:
-                arg_sig += "s"
-            elif arg.t == Type.BOOL:
-                arg_sig += "b"
-            elif arg.t == Type.OBJECT:
-                arg_sig += "o"
-            elif arg.t == Type.FUNCTION:
-                arg_sig += "f"
-            elif arg.t == Type.VOID:
+            if arg.t is Type.VOID:
                 super().error(
                     ErrorType.TYPE_ERROR, "void type not allowed as parameter"
                 )
-            else:
+            elif arg.t not in TYPE_SIGNATURES:
                 raise Exception("shouldn't reach this!")
-        return arg_sig
 
     # @debug_logger_with_return_val
     def __create_interface_table(self, ast):
@@ -284,89 +731,103 @@ class Interpreter(InterpreterBase):
             return True
         
         # we only expect object types
-        if obj.t != Type.OBJECT:
+        if obj.t is not Type.OBJECT:
             return False
         
         # compare object fields to named fields and functions of interface
-        obj_fields = obj.v
+        get_field = obj.v.get
 
-        for field_name, field_type in interface.field_vars.items():
-            if field_name not in obj_fields:
-                return False
-            obj_value = obj_fields[field_name]
-            if obj_value.t != field_type:
+        for field_name, field_type in interface.var_checks:
+            obj_value = get_field(field_name)
+            if obj_value is None or obj_value.t is not field_type:
                 return False
             
-        for field_name, field_sig in interface.field_funcs.items():
-            if field_name not in obj_fields:
-                return False
-            obj_value = obj_fields[field_name]
-
-            if obj_value.t != Type.FUNCTION:
+        for field_name, field_sig in interface.func_checks:
+            obj_value = get_field(field_name)
+            if obj_value is None or obj_value.t is not Type.FUNCTION:
                 return False
 
-            # check if function signatures match
-            if not self.__check_function_signatures(obj_value.v, field_sig):
+            # check if function signatures match, once per function and field
+            func_obj = obj_value.v
+            matches = func_obj.interface_matches.get((interface_name, field_name))
+            if matches is None:
+                matches = self.__check_function_signatures(func_obj, field_sig)
+                func_obj.interface_matches[(interface_name, field_name)] = matches
+            if not matches:
                 return False
         return True
 
     # @debug_logger_with_return_val
     def __check_function_signatures(self, obj_sig, field_sig):
         # object signatures should match. Count, types, and if reference
-        formal_args = obj_sig.formal_args
+        formal_params = obj_sig.formal_params
 
-        if len(formal_args) != len(field_sig):
+        if len(formal_params) != len(field_sig):
             return False
         
-        for formal_name, (field_type, field_ref) in zip(formal_args.keys(), field_sig):
-            formal_type = Type.get_type(formal_name)
-
-            if formal_type != field_type:
+        for (_, formal_ref, formal_type, _), (field_type, field_ref) in zip(formal_params, field_sig):
+            if formal_type is not field_type:
                 return False
             
-            formal_ref = formal_args[formal_name]
             if formal_ref != field_ref:
                 return False
         return True
     
     # @debug_logger_with_return_val
     def __create_lambda(self, lambda_ast):
-        inscope_vars = self.env.capture_vars()
-        lambda_params = lambda_ast.get("args")
-
-        # create closure with correct capture methods
-        # primitives -> capture by value. objs and funcs -> capture by ref
-        captured_vars = {}
-        for name, val in inscope_vars.items():
-            # shadow if lambda parameters with same name as captured variables
-            if name in lambda_params:
-                continue
-
-            if val.t in {Type.INT, Type.STRING, Type.BOOL}:
-                captured_vars[name] = copy(val)
-            elif val.t in {Type.OBJECT, Type.FUNCTION}:
-                captured_vars[name] = Value(val.t, val.v) # prevent global reassignment
-            else:
-                captured_vars[name] = copy(val)
+        # parameters with the same name as a captured variable shadow it when called
+        captured_vars = self.env.capture_vars()
 
         lambda_obj = Lambda(lambda_ast, captured_vars)
+        # the body only depends on the AST, so every lambda made from it shares one;
+        # None when it could not be compiled
+        if not hasattr(lambda_ast, "compiled"):
+            lambda_ast.compiled = self.compiler.compile("lambda", lambda_obj)
+        lambda_obj.compiled = lambda_ast.compiled
         return Value(Type.FUNCTION, lambda_obj)
         
    
     # @debug_logger_with_return_val
     def __create_function_table(self, ast):
         self.funcs = {}
+        self.funcs_by_name = {}
         valid_types = {"i", "s", "b", "o", "f"}
         for func in ast.get("functions"):
             name = func.get("name")
             param_type_sig = self.__get_parameters_type_signature(func.get("args"))
             func_obj = Function(func)
-            if func_obj.return_type == Type.ERROR:
+            if func_obj.return_type is Type.ERROR:
                 super().error(ErrorType.TYPE_ERROR)
             type_sig = (name, param_type_sig)
             if type_sig in self.funcs:
                 super().error(ErrorType.NAME_ERROR, "function already defined")
             self.funcs[type_sig] = func_obj
+            self.funcs_by_name.setdefault(name, []).append(type_sig)
+
+    def __compile_functions(self):
+        """Turn every named function's body into Python once, before main runs"""
+        env = self.env
+        # kept for lambdas, which are compiled when first created
+        self.compiler = compiler = FunctionCompiler(
+            set(self.funcs_by_name),
+            {
+                "env_get": env.get,
+                "fdef": env.fdef,
+                "bdef": env.bdef,
+                "enter_block": env.enter_block,
+                "exit_block": env.exit_block,
+                "error": self.error,
+                "eval_expr": self.eval_expr,
+                "run_fcall": self.__run_fcall,
+                "run_assign": self.__run_assign,
+                "run_vardef": self.__run_vardef,
+                "binary_op": self.__eval_binary_op,
+                "neg": self.__eval_neg,
+                "not_": self.__eval_not,
+            },
+        )
+        for (name, _), func_obj in self.funcs.items():
+            func_obj.compiled = compiler.compile(name, func_obj)
 
     # @debug_logger_with_return_val
     def __get_function(self, name, param_type_signature=""):
@@ -374,10 +835,24 @@ class Interpreter(InterpreterBase):
             super().error(ErrorType.NAME_ERROR, "function not found")
         return self.funcs[(name, param_type_signature)]
 
+    def __resolve_function(self, fcall_name, args_type_sig):
+        # check bad interface parameter passing. 
+        # when func_def fails, it will always give name error. In the case above, we need to check for Type.ERROR too
+        try:
+            func_def = self.__get_function(fcall_name, args_type_sig)
+        except:
+            # name error means there could be a function that exists but wrong type signatures
+            if fcall_name in self.funcs_by_name:
+                super().error(ErrorType.TYPE_ERROR, "argument type mismatch")
+            else:
+                super().error(ErrorType.NAME_ERROR, "function not found")
+
+        return func_def
+
     def __run_vardef(self, statement, block_def=False):
         name = statement.get("name")
         var_type = Type.get_type(name)
-        if var_type == Type.ERROR or var_type == Type.VOID:
+        if var_type is Type.ERROR or var_type is Type.VOID:
             super().error(ErrorType.TYPE_ERROR, "invalid variable type")
 
         default_value = Value(var_type)
@@ -388,21 +863,32 @@ class Interpreter(InterpreterBase):
             if not self.env.fdef(name, default_value):
                 super().error(ErrorType.NAME_ERROR, "variable already defined")
 
+    def __run_bvardef(self, statement):
+        self.__run_vardef(statement, True)
+
     # @debug_logger_with_return_val
     def __run_assign(self, statement):
-        name = statement.get("var")
-        dotted_name = name.split(".")
+        # the target's parts, type and interface never change, so work them out once
+        resolved = getattr(statement, "resolved", None)
+        if resolved is None:
+            dotted_name = split_name(statement.get("var"))
+            resolved = statement.resolved = (
+                dotted_name,
+                Type.get_type(dotted_name[-1]),
+                self.__get_interface_name(dotted_name[-1]), # either the name or None
+                # (member, whether its name marks an object) for xo.yo in xo.yo.zi
+                tuple((sub, sub[-1] == "o" or sub[-1].isupper()) for sub in dotted_name[1:-1]),
+            )
+        dotted_name, var_type, interface_name, inner_members = resolved
         rvalue = self.eval_expr(statement.get("expression"))
 
-        if not self.env.exists(dotted_name[0]):
+        lvalue = self.env.get(dotted_name[0])
+        if lvalue is None:
             super().error(ErrorType.NAME_ERROR, "variable not defined")
 
-        var_type = Type.get_type(dotted_name[-1])
-
-        # check if assignment to interface: returns either the name or None
-        interface_name = self.__get_interface_name(dotted_name[-1])
+        # check if assignment to interface
         if interface_name:
-            if rvalue.t != Type.OBJECT:
+            if rvalue.t is not Type.OBJECT:
                 super().error(ErrorType.TYPE_ERROR, "interface variable can only be assigned to an object")
             # check if the obj value satisfies the interface
             elif not self.__interface_satisfaction(rvalue, interface_name):
@@ -410,41 +896,39 @@ class Interpreter(InterpreterBase):
         else:
             # allow nil assignment to objects and function
             if rvalue.v is None:
-                if var_type not in [Type.OBJECT, Type.FUNCTION]:
+                if var_type not in NIL_TYPES:
                     super().error(ErrorType.TYPE_ERROR, "type mismatch in assignment")
 
-            elif var_type != rvalue.t:
+            elif var_type is not rvalue.t:
                 super().error(ErrorType.TYPE_ERROR, "type mismatch in assignment")
 
         if len(dotted_name) == 1:
-            value = self.env.get(name)
-            value.set(
+            lvalue.set(
                 rvalue
             )  # update the value pointed to by the variable, not the mapping in the env
             return
 
-        lvalue = self.env.get(dotted_name[0])
-        if lvalue.t != Type.OBJECT:
+        if lvalue.t is not Type.OBJECT:
             super().error(ErrorType.TYPE_ERROR, "cannot access member of non-object")
-        if lvalue.v == None:
+        if lvalue.v is None:
             super().error(ErrorType.FAULT_ERROR, "cannot dereference nil object")
 
-        suffix_name = dotted_name[1:-1]
         # xo.yo.zi = 5;
-        for sub in suffix_name:
-            if sub not in lvalue.v:
+        for sub, is_object in inner_members:
+            fields = lvalue.v
+            if sub not in fields:
                 super().error(ErrorType.NAME_ERROR, "object member not found")
             # every inner item must be an object, ending in an o
-            if sub[-1] != "o" and not sub[-1].isupper():
+            if not is_object:
                 super().error(ErrorType.TYPE_ERROR, "member must be an object")
-            lvalue = lvalue.v[sub]
+            lvalue = fields[sub]
             # every inner object must be non-nil
-            if lvalue.v == None:
+            if lvalue.v is None:
                 super().error(
                     ErrorType.FAULT_ERROR, "cannot dereference nil member object"
                 )
 
-        if rvalue.t == Type.OBJECT:
+        if rvalue.t is Type.OBJECT:
             lvalue.v[dotted_name[-1]] = rvalue
         else:
             lvalue.v[dotted_name[-1]] = Value(rvalue.t, rvalue.v)
@@ -471,11 +955,11 @@ class Interpreter(InterpreterBase):
 
         for arg in args:
             c_out = self.eval_expr(arg)
-            if c_out.t == Type.VOID:
+            if c_out.t is Type.VOID:
                 super().error(
                     ErrorType.TYPE_ERROR, "cannot pass void argument to function"
                 )
-            if c_out.t == Type.BOOL:
+            if c_out.t is Type.BOOL:
                 out += str(c_out.v).lower()
             else:
                 out += str(c_out.v)
@@ -496,112 +980,104 @@ class Interpreter(InterpreterBase):
 
         # call through method, if it is one
         if "." in fcall_name:
-            return self.__run_method_call(fcall_name, args)
+            return self.__run_method_call(func_call_ast, args)
 
         # call through function value, if it is one
-        if self.env.env: # make sure we're at least in main
+        if self.env.in_func(): # make sure we're at least in main
             func_val = self.env.get(fcall_name)
-            if func_val is not None and func_val.t == Type.FUNCTION:
+            if func_val is not None and func_val.t is Type.FUNCTION:
                 if func_val.v is None:
                     super().error(ErrorType.FAULT_ERROR, "cannot call a nil function")
                 # helper function for calling through function value
                 return self.__call_function_value(func_val.v, args)
 
-        actual_args = [self.eval_expr(a) for a in args]
+        actual_args = self.__eval_args(args)
         args_type_sig = self.__get_arguments_type_signature(actual_args)
 
-        # check bad interface parameter passing. 
-        # when func_def fails, it will always give name error. In the case above, we need to check for Type.ERROR too
-        try:
-            func_def = self.__get_function(fcall_name, args_type_sig)
-        except:
-            # name error means there could be a function that exists but wrong type signatures
-            existing_funcs = []
-            for key in self.funcs.keys():
-                if key[0] == fcall_name:
-                    existing_funcs.append(self.funcs[key])
-            if existing_funcs:
-                super().error(ErrorType.TYPE_ERROR, "argument type mismatch")
-            else:
-                super().error(ErrorType.NAME_ERROR, "function not found")
-                
+        # a call site nearly always sees the same argument types, so it remembers
+        # the function it resolved to last time
+        cached = getattr(func_call_ast, "func_cache", None)
+        if cached is not None and cached[0] == args_type_sig:
+            func_def = cached[1]
+        else:
+            func_def = self.__resolve_function(fcall_name, args_type_sig)
+            func_call_ast.func_cache = (args_type_sig, func_def)
+
         # interface satisfaction during parameter passing
-        for formal_name, actual_arg in zip(func_def.formal_args.keys(), actual_args):
-            interface_name = self.__get_interface_name(formal_name) # return interface name or None
+        for (_, _, _, interface_name), actual_arg in zip(func_def.formal_params, actual_args):
             if interface_name:
-                if actual_arg.t != Type.OBJECT:
+                if actual_arg.t is not Type.OBJECT:
                     super().error(ErrorType.TYPE_ERROR, "argument can only be an object")
                 # check if the obj value satisfies the interface
                 elif not self.__interface_satisfaction(actual_arg, interface_name):
                     super().error(ErrorType.TYPE_ERROR, "argument does not satisfy the interface")
 
         self.env.enter_func()
-        for formal, actual in zip(func_def.formal_args.keys(), actual_args):
-            ref_param = func_def.formal_args[
-                formal
-            ]  # determine if it's a reference or not
+        for (formal, ref_param, _, _), actual in zip(func_def.formal_params, actual_args):
             actual = self.__clone_for_passing(actual, ref_param)
             self.env.fdef(
                 formal, actual
             )  # no need to check types since we used types for overloading to pick a compatible function already
-        res, _ = self.__run_statements(func_def, func_def.statements)
+        res = self.__run_body(func_def)
         self.env.exit_func()
 
         return res
     
     # @debug_logger_with_return_val
-    def __run_method_call(self, method_path, args):
-        dotted_name = method_path.split(".")
-        
-        if not self.env.exists(dotted_name[0]):
+    def __run_method_call(self, func_call_ast, args):
+        # the path never changes, so split it and flag its inner members once
+        resolved = getattr(func_call_ast, "resolved", None)
+        if resolved is None:
+            dotted_name = split_name(func_call_ast.get("name"))
+            resolved = func_call_ast.resolved = (
+                dotted_name[0],
+                # (member, whether its name marks an object) for xo.yo in xo.yo.mf
+                tuple((sub, sub[-1] == "o") for sub in dotted_name[1:-1]),
+                dotted_name[-1],
+            )
+        base_name, inner_members, method_name = resolved
+
+        value = self.env.get(base_name)
+        if value is None:
             super().error(ErrorType.NAME_ERROR, "variable not defined")
-        
-        value = self.env.get(dotted_name[0])
-        suffix_name = dotted_name[1:]
-        for i, sub in enumerate(suffix_name[:-1]):
-            if value.v == None:  # NIL
-                super().error(ErrorType.FAULT_ERROR, "nil reference access")
-            if sub not in value.v:
-                super().error(ErrorType.NAME_ERROR, "object member not found")
-            # every inner item must be an object, ending in an o        
-            if i < len(suffix_name) - 1 and sub[-1] != "o":
-                super().error(ErrorType.TYPE_ERROR, "member must be an object")
-            value = value.v[sub]
 
-        method_name = suffix_name[-1]
+        value = self.__walk_members(value, inner_members)
+
         # make sure object has the method
         if method_name not in value.v:
             super().error(ErrorType.NAME_ERROR, "method not found")
         method_value = value.v[method_name]
 
         # check if valid function
-        if method_value.t != Type.FUNCTION:
+        if method_value.t is not Type.FUNCTION:
             super().error(ErrorType.TYPE_ERROR, "calling a non-function")
         if method_value.v is None:
             super().error(ErrorType.FAULT_ERROR, "calling a nil function")
 
         return self.__call_function_value(method_value.v, args, value)
 
+    def __walk_members(self, value, inner_members):
+        """Follow xo.yo in xo.yo.zi from xo's value, given (member, is_object) pairs"""
+        for sub, is_object in inner_members:
+            fields = value.v
+            if fields is None:  # NIL
+                super().error(ErrorType.FAULT_ERROR, "nil reference access")
+            value = fields.get(sub)
+            if value is None:
+                super().error(ErrorType.NAME_ERROR, "object member not found")
+            # every inner item must be an object, ending in an o
+            if not is_object:
+                super().error(ErrorType.TYPE_ERROR, "member must be an object")
+        return value
+
     def __call_function_value(self, func_obj, args, selfo=None):
-        actual_args = [self.eval_expr(a) for a in args]
+        actual_args = self.__eval_args(args)
         args_type_sig = self.__get_arguments_type_signature(actual_args)
 
-        # validate number of arguments and types
-        if len(actual_args) != len(func_obj.formal_args):
+        # validate number of arguments
+        if len(actual_args) != len(func_obj.formal_params):
             super().error(ErrorType.TYPE_ERROR, "number of arguments don't match")
-        
-        for formal, actual in zip(func_obj.formal_args.keys(), actual_args):
-            corr_type = Type.get_type(formal)
-            if corr_type != actual.t:
-                super().error(ErrorType.TYPE_ERROR, "argument type mismatch")
 
-            # check interface is satisfied when passed through function value
-            interface_name = self.__get_interface_name(formal)
-            if interface_name:
-                if actual.t != Type.OBJECT:
-                    super().error(ErrorType.TYPE_ERROR, "argument takes in object of interface type")
-                if not self.__interface_satisfaction(actual, interface_name):
-                    super().error(ErrorType.TYPE_ERROR, "object does not satisfy interface")
         self.env.enter_func()
 
         # if method call, define selfo too
@@ -613,21 +1089,30 @@ class Interpreter(InterpreterBase):
             for name, val in func_obj.captured_vars.items():
                 self.env.fdef(name, val)
 
-        for formal, actual in zip(func_obj.formal_args.keys(), actual_args):
-            ref_param = func_obj.formal_args[
-                formal
-            ]  # determine if it's a reference or not
+        # check each argument's type and bind it in one pass; a failed check ends
+        # the program, so binding earlier arguments first is not observable
+        for (formal, ref_param, corr_type, interface_name), actual in zip(func_obj.formal_params, actual_args):
+            if corr_type is not actual.t:
+                super().error(ErrorType.TYPE_ERROR, "argument type mismatch")
+
+            # check interface is satisfied when passed through function value
+            if interface_name:
+                if actual.t is not Type.OBJECT:
+                    super().error(ErrorType.TYPE_ERROR, "argument takes in object of interface type")
+                if not self.__interface_satisfaction(actual, interface_name):
+                    super().error(ErrorType.TYPE_ERROR, "object does not satisfy interface")
+
             actual = self.__clone_for_passing(actual, ref_param)
             
             # handle shadowing if parameter shadows variable
-            if self.env.exists(formal):
-                shadowed_val = self.env.get(formal)
+            shadowed_val = self.env.get(formal)
+            if shadowed_val is not None:
                 shadowed_val.set(actual)
             else:
                 self.env.fdef(
                     formal, actual
-                )  # no need to check types since we used types for overloading to pick a compatible function already
-        res, _ = self.__run_statements(func_obj, func_obj.statements)
+                )  # types were checked above
+        res = self.__run_body(func_obj)
         self.env.exit_func()
 
         return res
@@ -635,44 +1120,71 @@ class Interpreter(InterpreterBase):
     def __clone_for_passing(self, arg, ref_param):
         if ref_param:
             return arg  # pass by reference - value is the original value from the calling function
-        return copy(
-            arg
-        )  # perform a shallow copy of the value, but still point at the original Python value
+        # a new Value with the same type, still pointing at the original Python value
+        return Value(arg.t, arg.v)
+
+    def __run_body(self, funcdef):
+        if funcdef.compiled is not None:
+            res = funcdef.compiled()
+            ret = res is not None
+        else:
+            # too deeply nested for Python to compile; walk the tree instead
+            res, ret = self.__run_statements(funcdef, funcdef.statements)
+        if not ret:
+            # fell off the end: the default for the return type, made only now since
+            # values are mutable and each call needs its own
+            res = Value(funcdef.return_type)
+        return res
 
     def __run_if(self, funcdef, statement):
         cond = self.eval_expr(statement.get("condition"))
 
-        if cond.t != Type.BOOL:
+        if cond.t is not Type.BOOL:
             super().error(ErrorType.TYPE_ERROR, "condition must be boolean")
 
-        self.env.enter_block()
+        # whether either branch declares a bvar, worked out on the first run
+        block = getattr(statement, "needs_block", None)
+        if block is None:
+            block = statement.needs_block = needs_block(
+                statement.get("statements"), statement.get("else_statements")
+            )
+        if block:
+            self.env.enter_block()
 
-        res, ret = Value(funcdef.return_type), False
+        res, ret = None, False
 
         if cond.v:
             res, ret = self.__run_statements(funcdef, statement.get("statements"))
         elif statement.get("else_statements"):
             res, ret = self.__run_statements(funcdef, statement.get("else_statements"))
 
-        self.env.exit_block()
+        if block:
+            self.env.exit_block()
 
         return res, ret
 
     def __run_while(self, funcdef, statement):
-        res, ret = Value(funcdef.return_type), False
+        res, ret = None, False
+        condition, body = statement.get("condition"), statement.get("statements")
+        block = getattr(statement, "needs_block", None)
+        if block is None:
+            block = statement.needs_block = needs_block(body)
 
         while True:
-            cond = self.eval_expr(statement.get("condition"))
+            cond = self.eval_expr(condition)
 
-            if cond.t != Type.BOOL:
+            if cond.t is not Type.BOOL:
                 super().error(ErrorType.TYPE_ERROR, "condition must be boolean")
 
             if not cond.v:
                 break
 
-            self.env.enter_block()
-            res, ret = self.__run_statements(funcdef, statement.get("statements"))
-            self.env.exit_block()
+            if block:
+                self.env.enter_block()
+                res, ret = self.__run_statements(funcdef, body)
+                self.env.exit_block()
+            else:
+                res, ret = self.__run_statements(funcdef, body)
             if ret:
                 break
 
@@ -683,35 +1195,27 @@ class Interpreter(InterpreterBase):
         if not expr:
             return (Value(funcdef.return_type), True)
         result_val = self.eval_expr(expr)
-        if result_val.t != funcdef.return_type:
+        if result_val.t is not funcdef.return_type:
             super().error(ErrorType.TYPE_ERROR, "return type mismatch")
         return (result_val, True)
 
     def __run_statements(self, funcdef, statements):
-        res, ret = Value(funcdef.return_type), False
+        res, ret = None, False
+        stmt_dispatch, ctrl_dispatch = self.stmt_dispatch, self.ctrl_dispatch
 
         for statement in statements:
             kind = statement.elem_type
 
-            if kind == self.VAR_DEF_NODE:
-                self.__run_vardef(statement)
-            if kind == self.BVAR_DEF_NODE:
-                self.__run_vardef(statement, True)
-            elif kind == "=":
-                self.__run_assign(statement)
-            elif kind == self.FCALL_NODE:
-                self.__run_fcall(statement)
-            elif kind == self.IF_NODE:
-                res, ret = self.__run_if(funcdef, statement)
-                if ret:
-                    break
-            elif kind == self.WHILE_NODE:
-                res, ret = self.__run_while(funcdef, statement)
+            handler = stmt_dispatch.get(kind)
+            if handler is not None:
+                handler(statement)
+                continue
+
+            handler = ctrl_dispatch.get(kind)
+            if handler is not None:
+                res, ret = handler(funcdef, statement)
                 if ret:
                     break
-            elif kind == self.RETURN_NODE:
-                res, ret = self.__run_return(funcdef, statement)
-                break
 
         return res, ret
 
@@ -720,202 +1224,157 @@ class Interpreter(InterpreterBase):
         tl, tr = vl.t, vr.t
         vl_val, vr_val = vl.v, vr.v
 
+        # arithmetic, comparisons and logic; equality is never in the table
+        operation = BINARY_OPS.get((kind, tl, tr))
+        if operation is not None:
+            return operation(vl_val, vr_val)
+
         if kind == "==":
             # nil == nil always true
             if vl_val is None and vr_val is None:
                 return Value(Type.BOOL, True)
 
-            if tl == Type.OBJECT and tr == Type.OBJECT:
-                return Value(Type.BOOL, tl == tr and vl_val is vr_val)
+            if tl is Type.OBJECT and tr is Type.OBJECT:
+                return Value(Type.BOOL, tl is tr and vl_val is vr_val)
 
             # function-variables equality
-            if tl == Type.FUNCTION and tr == Type.FUNCTION:
-                return Value(Type.BOOL, tl == tr and vl_val is vr_val)
+            if tl is Type.FUNCTION and tr is Type.FUNCTION:
+                return Value(Type.BOOL, tl is tr and vl_val is vr_val)
 
             # function and nil comparison
-            if (tl == Type.FUNCTION and tr == Type.OBJECT):
+            if (tl is Type.FUNCTION and tr is Type.OBJECT):
                 return Value(Type.BOOL, False)    
                 
-            return Value(Type.BOOL, tl == tr and vl_val == vr_val)
+            return Value(Type.BOOL, tl is tr and vl_val == vr_val)
         
         if kind == "!=":
             if vl_val is None and vr_val is None:
                 return Value(Type.BOOL, False)
 
-            if tl == Type.OBJECT and tr == Type.OBJECT:
-                return Value(Type.BOOL, not (tl == tr and vl_val is vr_val))
+            if tl is Type.OBJECT and tr is Type.OBJECT:
+                return Value(Type.BOOL, not (tl is tr and vl_val is vr_val))
             
-            if tl == Type.FUNCTION and tr == Type.FUNCTION:
-                return Value(Type.BOOL, not (tl == tr and vl_val is vr_val))
+            if tl is Type.FUNCTION and tr is Type.FUNCTION:
+                return Value(Type.BOOL, not (tl is tr and vl_val is vr_val))
 
-            if (tl == Type.FUNCTION and tr == Type.OBJECT):
+            if (tl is Type.FUNCTION and tr is Type.OBJECT):
                 return Value(Type.BOOL, True)  
-            return Value(Type.BOOL, not (tl == tr and vl_val == vr_val))
-
-        if tl == Type.STRING and tr == Type.STRING:
-            if kind == "+":
-                return Value(Type.STRING, vl_val + vr_val)
-
-        if tl == Type.INT and tr == Type.INT:
-            if kind == "+":
-                return Value(Type.INT, vl_val + vr_val)
-            if kind == "-":
-                return Value(Type.INT, vl_val - vr_val)
-            if kind == "*":
-                return Value(Type.INT, vl_val * vr_val)
-            if kind == "/":
-                return Value(Type.INT, vl_val // vr_val)
-            if kind == "<":
-                return Value(Type.BOOL, vl_val < vr_val)
-            if kind == "<=":
-                return Value(Type.BOOL, vl_val <= vr_val)
-            if kind == ">":
-                return Value(Type.BOOL, vl_val > vr_val)
-            if kind == ">=":
-                return Value(Type.BOOL, vl_val >= vr_val)
-
-        if tl == Type.BOOL and tr == Type.BOOL:
-            if kind == "&&":
-                return Value(Type.BOOL, vl_val and vr_val)
-            if kind == "||":
-                return Value(Type.BOOL, vl_val or vr_val)
+            return Value(Type.BOOL, not (tl is tr and vl_val == vr_val))
 
         super().error(ErrorType.TYPE_ERROR, "invalid binary operation")
 
+    def __eval_neg(self, o):
+        if o.t is Type.INT:
+            return Value(Type.INT, -o.v)
+
+        super().error(ErrorType.TYPE_ERROR, "cannot negate non-integer")
+
+    def __eval_not(self, o):
+        if o.t is Type.BOOL:
+            return Value(Type.BOOL, not o.v)
+
+        super().error(ErrorType.TYPE_ERROR, "cannot apply NOT to non-boolean")
+
     def __eval_convert(self, expr):
         """Evaluate type conversion operations"""
-        val = self.eval_expr(expr.get("expr"))
+        val = self.eval_expr(expr.expr)
         to_type = expr.get("to_type")
 
-        if to_type == "int":
-            if val.t == Type.INT:
-                return val
-            elif val.t == Type.STRING:
-                try:
-                    return Value(Type.INT, int(val.v))
-                except ValueError:
-                    super().error(ErrorType.TYPE_ERROR, "cannot convert string to int")
-            elif val.t == Type.BOOL:
-                return Value(Type.INT, 1 if val.v else 0)
-            else:
-                super().error(ErrorType.TYPE_ERROR, "cannot convert object to int")
-
-        elif to_type == "str":
-            if val.t == Type.STRING:
-                return val
-            elif val.t == Type.INT:
-                return Value(Type.STRING, str(val.v))
-            elif val.t == Type.BOOL:
-                return Value(Type.STRING, str(val.v).lower())
-            else:
-                super().error(ErrorType.TYPE_ERROR, "cannot convert object to string")
-
-        elif to_type == "bool":
-            if val.t == Type.BOOL:
-                return val
-            elif val.t == Type.INT:
-                return Value(Type.BOOL, val.v != 0)
-            elif val.t == Type.STRING:
-                return Value(Type.BOOL, val.v != "")
-            else:
-                super().error(ErrorType.TYPE_ERROR, "cannot convert object to bool")
-        else:
+        convert = CONVERSIONS.get((to_type, val.t))
+        if convert is not None:
+            res = convert(val)
+            if res is None:
+                super().error(ErrorType.TYPE_ERROR, "cannot convert string to int")
+            return res
+
+        if to_type not in CONVERSION_ERRORS:
             super().error(ErrorType.TYPE_ERROR, "invalid conversion type")
+        super().error(ErrorType.TYPE_ERROR, CONVERSION_ERRORS[to_type])
 
     # @debug_logger_with_return_val
     def __get_var_value(self, expr):
-        dotted_name = expr.get("name").split(".")
-
-        # first-class functions: check if defined function, not variable
-        if len(dotted_name) == 1:
-            func_name = dotted_name[0]
+        # the name's parts and what they must be never change, so the lookup that
+        # fits them is picked once: a function, a plain variable or a member
+        resolved = getattr(expr, "resolved", None)
+        if resolved is None:
+            resolved = expr.resolved = self.__resolve_name(expr.get("name"))
+        return resolved[0](resolved)
 
-            # look for matching functions, by function signature
-            func_var = [key for key in self.funcs.keys() if key[0] == func_name]
+    def __resolve_name(self, name):
+        dotted_name = split_name(name)
+        base_name = dotted_name[0]
 
-            if len(func_var) == 1:
-                func_obj = self.funcs[func_var[0]]
-                return Value(Type.FUNCTION, func_obj)
-            # ambiguous case: undefined behavior
-            elif len(func_var) > 1:
-                super().error(ErrorType.NAME_ERROR, "ambiguous function-value assignments for overloaded names")
+        if len(dotted_name) == 1:
+            # first-class functions: defined functions with this name, by function
+            # signature; the table is fixed once the program runs
+            functions = tuple(self.funcs[key] for key in self.funcs_by_name.get(base_name, ()))
+            if functions:
+                return (self.__get_function_value, functions)
+            return (self.__get_plain_value, base_name)
+
+        base_last_ltr = base_name[-1]
+        return (
+            self.__get_member_value,
+            base_name,
+            # handle interface base types too
+            base_last_ltr.isupper() or base_last_ltr == "o",
+            # (member, whether its name passes as an object) for xo.yo in xo.yo.zi
+            tuple((sub, sub[-1] == "o" or sub[-1].isupper()) for sub in dotted_name[1:-1]),
+            # the member that is read, which may be anything
+            dotted_name[-1],
+        )
 
-        if not self.env.exists(dotted_name[0]):
+    def __get_function_value(self, resolved):
+        # check if defined function, not variable
+        functions = resolved[1]
+        if len(functions) == 1:
+            return Value(Type.FUNCTION, functions[0])
+        # ambiguous case: undefined behavior
+        super().error(ErrorType.NAME_ERROR, "ambiguous function-value assignments for overloaded names")
+
+    def __get_plain_value(self, resolved):
+        value = self.env.get(resolved[1])
+        if value is None:
             super().error(ErrorType.NAME_ERROR, "variable not defined")
-        value = self.env.get(dotted_name[0])
-        suffix_name = dotted_name[1:]
-
-        # handle interface base types too
-        if len(dotted_name) > 1:
-            base_last_ltr = dotted_name[0][-1]
-            if not base_last_ltr.isupper() and base_last_ltr != "o":
-                super().error(ErrorType.TYPE_ERROR, "cannot dereference a non-object")
-        for i, sub in enumerate(suffix_name):
-            if value.v == None:  # NIL
-                super().error(ErrorType.FAULT_ERROR, "nil reference access")
-            if sub not in value.v:
-                super().error(ErrorType.NAME_ERROR, "object member not found")
-            # every inner item must be an object, ending in an o
-            if i < len(suffix_name) - 1 and sub[-1] != "o" and not sub[-1].isupper():
-                super().error(ErrorType.TYPE_ERROR, "member must be an object")
-            value = value.v[sub]
         return value
 
-    # @debug_logger_with_return_val
-    def eval_expr(self, expr):
-        kind = expr.elem_type
-
-        if kind == self.INT_NODE:
-            return Value(Type.INT, expr.get("val"))
-
-        if kind == self.STRING_NODE:
-            return Value(Type.STRING, expr.get("val"))
-
-        if kind == self.BOOL_NODE:
-            return Value(Type.BOOL, expr.get("val"))
-
-        if kind == self.NIL_NODE:
-            return Value(Type.OBJECT)
-
-        if kind == self.EMPTY_OBJ_NODE:
-            return Value(Type.OBJECT, {})
+    def __get_member_value(self, resolved):
+        _, base_name, base_is_object, inner_members, member = resolved
 
-        if kind == self.QUALIFIED_NAME_NODE:
-            return self.__get_var_value(expr)
-
-        if kind == self.FCALL_NODE:
-            return self.__run_fcall(expr)
-
-        if kind == self.FUNC_NODE: # lambda
-            return self.__create_lambda(expr)
-
-        if kind in self.bops:
-            l, r = self.eval_expr(expr.get("op1")), self.eval_expr(expr.get("op2"))
-            return self.__eval_binary_op(kind, l, r)
-
-        if kind == self.NEG_NODE:
-            o = self.eval_expr(expr.get("op1"))
-            if o.t == Type.INT:
-                return Value(Type.INT, -o.v)
-
-            super().error(ErrorType.TYPE_ERROR, "cannot negate non-integer")
+        value = self.env.get(base_name)
+        if value is None:
+            super().error(ErrorType.NAME_ERROR, "variable not defined")
 
-        if kind == self.NOT_NODE:
-            o = self.eval_expr(expr.get("op1"))
-            if o.t == Type.BOOL:
-                return Value(Type.BOOL, not o.v)
+        if not base_is_object:
+            super().error(ErrorType.TYPE_ERROR, "cannot dereference a non-object")
+        value = self.__walk_members(value, inner_members)
 
-            super().error(ErrorType.TYPE_ERROR, "cannot apply NOT to non-boolean")
+        fields = value.v
+        if fields is None:  # NIL
+            super().error(ErrorType.FAULT_ERROR, "nil reference access")
+        value = fields.get(member)
+        if value is None:
+            super().error(ErrorType.NAME_ERROR, "object member not found")
+        return value
 
-        if kind == self.CONVERT_NODE:
-            return self.__eval_convert(expr)
+    # @debug_logger_with_return_val
+    def eval_expr(self, expr):
+        handler = self.expr_dispatch.get(expr.elem_type)
+        if handler is None:
+            raise Exception("should not get here!")
+        return handler(expr)
 
-        raise Exception("should not get here!")
+    def __eval_binary_expr(self, expr):
+        l, r = self.eval_expr(expr.op1), self.eval_expr(expr.op2)
+        return self.__eval_binary_op(expr.elem_type, l, r)
 
 
 def main():
-    import sys
-
+    """
+    Run a Brewin program: python3 interpreterv4.py [program.br]. Only the standard
+    library is used (compiled function bodies are plain Python source), so pypy3
+    can run it the same way for long-running programs.
+    """
     interpreter = Interpreter()
 
     # Use command line argument if provided, otherwise default to test.br
@@ -0,0 +1,97 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'leftORleftANDleftGREATER_EQGREATERLESS_EQLESSEQNOT_EQleftPLUSMINUSleftMULTIPLYDIVIDErightUMINUSNOTAMP AND ASSIGN AT BOOL BVAR CLOSURE COMMA DEF DIVIDE DOT ELSE EQ FALSE GREATER GREATER_EQ IF INT INTERFACE LAMBDA LBRACE LESS LESS_EQ LPAREN MINUS MULTIPLY NAME NIL NOT NOT_EQ NUMBER OR PLUS RBRACE RETURN RPAREN SEMI STR STRING TRUE VAR WHILEprogram : interfaces funcs\n    | funcsinterfaces : interfaces interface\n    | interfaceinterface : INTERFACE NAME LBRACE fields RBRACEfields : fields field\n    | fieldfield : field_function\n    | field_variablefield_function : NAME LPAREN formal_args RPAREN SEMI\n    | NAME LPAREN RPAREN SEMIfield_variable : NAME SEMIfuncs : funcs func\n    | funcfunc : DEF NAME LPAREN formal_args RPAREN LBRACE statements RBRACE\n    | DEF NAME LPAREN RPAREN LBRACE statements RBRACEformal_args : formal_args COMMA formal_arg\n    | formal_argformal_arg : NAME\n    | AMP NAMEstatements : statements statement\n    | statementstatement : assign SEMIassign : qualified_name ASSIGN expressionstatement : VAR qualified_name_no_dot SEMIstatement : BVAR qualified_name_no_dot SEMIqualified_name : qualified_name DOT NAME\n    | NAMEqualified_name_no_dot : NAMEstatement : IF LPAREN expression RPAREN LBRACE statements RBRACE\n    | IF LPAREN expression RPAREN LBRACE statements RBRACE ELSE LBRACE statements RBRACE\n    statement : WHILE LPAREN expression RPAREN LBRACE statements RBRACEstatement : expression SEMIstatement : RETURN expression SEMI\n    | RETURN SEMIexpression : NOT expressionexpression : MINUS expression %prec UMINUSexpression : INT LPAREN expression RPARENexpression : STR LPAREN expression RPARENexpression : BOOL LPAREN expression RPARENexpression : expression EQ expression\n    | expression GREATER expression\n    | expression LESS expression\n    | expression NOT_EQ expression\n    | expression GREATER_EQ expression\n    | expression LESS_EQ expression\n    | expression PLUS expression\n    | expression MINUS expression\n    | expression MULTIPLY expression\n    | expression DIVIDE expressionexpression : LPAREN expression RPARENexpression : expression OR expression\n    | expression AND expressionexpression : NUMBERexpression : TRUE\n    | FALSEexpression : STRINGexpression : CLOSURE NAMEexpression : ATexpression : NILexpression : qualified_name LPAREN args RPAREN\n    | qualified_name LPAREN RPARENexpression : qualified_nameargs : args COMMA expression\n    | expressionexpression : LAMBDA LPAREN formal_args RPAREN LBRACE statements RBRACE\n    | LAMBDA LPAREN RPAREN LBRACE statements RBRACE'
+    
+_lr_action_items = {'INTERFACE':([0,2,4,9,27,],[6,6,-4,-3,-5,]),'DEF':([0,2,3,4,5,8,9,10,27,67,101,],[7,7,7,-4,-14,7,-3,-13,-5,-16,-15,]),'$end':([1,3,5,8,10,67,101,],[0,-2,-14,-1,-13,-16,-15,]),'NAME':([6,7,13,14,16,17,18,19,24,25,26,28,30,31,35,38,39,40,42,43,47,49,50,58,63,64,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,89,90,91,92,95,96,97,99,100,103,104,119,133,138,139,140,142,143,144,145,146,148,149,152,153,154,],[11,12,15,20,15,-7,-8,-9,32,20,-12,-6,20,37,37,37,37,-22,71,71,37,37,37,98,-11,37,-21,-23,37,-33,37,37,37,37,37,37,37,37,37,37,37,37,37,-35,37,37,124,37,37,37,20,-10,-25,-26,-34,37,37,37,37,37,37,37,37,37,-30,-32,37,37,-31,]),'LBRACE':([11,22,29,129,130,131,137,151,],[13,31,35,138,139,140,142,152,]),'LPAREN':([12,15,31,35,37,38,39,40,44,46,47,48,49,50,51,52,53,61,64,66,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,89,90,91,95,96,97,103,104,119,124,133,138,139,140,142,143,144,145,146,148,149,152,153,154,],[14,25,38,38,-28,38,38,-22,73,87,38,91,38,38,95,96,97,99,38,91,-21,-23,38,-33,38,38,38,38,38,38,38,38,38,38,38,38,38,-35,38,38,38,38,38,-25,-26,-34,-27,38,38,38,38,38,38,38,38,38,-30,-32,38,38,-31,]),'RPAREN':([14,20,21,23,25,32,33,36,37,54,55,56,57,59,60,65,66,91,93,94,98,99,102,105,106,107,108,109,110,111,112,113,114,115,116,117,118,121,122,123,124,125,126,127,128,132,134,135,136,141,147,150,],[22,-19,29,-18,34,-20,62,-17,-28,-54,-55,-56,-57,-59,-60,102,-63,122,-36,-37,-58,129,-51,130,-41,-42,-43,-44,-45,-46,-47,-48,-49,-50,-52,-53,131,132,-62,-65,-27,134,135,136,137,-61,-38,-39,-40,-64,-67,-66,]),'AMP':([14,25,30,99,],[24,24,24,24,]),'SEMI':([15,34,37,41,45,47,48,54,55,56,57,59,60,62,66,70,71,72,88,93,94,98,102,106,107,108,109,110,111,112,113,114,115,116,117,120,122,124,132,134,135,136,147,150,],[26,63,-28,69,74,89,-63,-54,-55,-56,-57,-59,-60,100,-63,103,-29,104,119,-36,-37,-58,-51,-41,-42,-43,-44,-45,-46,-47,-48,-49,-50,-52,-53,-24,-62,-27,-61,-38,-39,-40,-67,-66,]),'RBRACE':([16,17,18,19,26,28,39,40,63,64,68,69,74,89,100,103,104,119,143,144,145,146,148,149,153,154,],[27,-7,-8,-9,-12,-6,67,-22,-11,101,-21,-23,-33,-35,-10,-25,-26,-34,147,148,149,150,-30,-32,154,-31,]),'COMMA':([20,21,23,32,33,36,37,54,55,56,57,59,60,66,93,94,98,102,106,107,108,109,110,111,112,113,114,115,116,117,121,122,123,124,128,132,134,135,136,141,147,150,],[-19,30,-18,-20,30,-17,-28,-54,-55,-56,-57,-59,-60,-63,-36,-37,-58,-51,-41,-42,-43,-44,-45,-46,-47,-48,-49,-50,-52,-53,133,-62,-65,-27,30,-61,-38,-39,-40,-64,-67,-66,]),'VAR':([31,35,39,40,64,68,69,74,89,103,104,119,138,139,140,142,143,144,145,146,148,149,152,153,154,],[42,42,42,-22,42,-21,-23,-33,-35,-25,-26,-34,42,42,42,42,42,42,42,42,-30,-32,42,42,-31,]),'BVAR':([31,35,39,40,64,68,69,74,89,103,104,119,138,139,140,142,143,144,145,146,148,149,152,153,154,],[43,43,43,-22,43,-21,-23,-33,-35,-25,-26,-34,43,43,43,43,43,43,43,43,-30,-32,43,43,-31,]),'IF':([31,35,39,40,64,68,69,74,89,103,104,119,138,139,140,142,143,144,145,146,148,149,152,153,154,],[44,44,44,-22,44,-21,-23,-33,-35,-25,-26,-34,44,44,44,44,44,44,44,44,-30,-32,44,44,-31,]),'WHILE':([31,35,39,40,64,68,69,74,89,103,104,119,138,139,140,142,143,144,145,146,148,149,152,153,154,],[46,46,46,-22,46,-21,-23,-33,-35,-25,-26,-34,46,46,46,46,46,46,46,46,-30,-32,46,46,-31,]),'RETURN':([31,35,39,40,64,68,69,74,89,103,104,119,138,139,140,142,143,144,145,146,148,149,152,153,154,],[47,47,47,-22,47,-21,-23,-33,-35,-25,-26,-34,47,47,47,47,47,47,47,47,-30,-32,47,47,-31,]),'NOT':([31,35,38,39,40,47,49,50,64,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,89,90,91,95,96,97,103,104,119,133,138,139,140,142,143,144,145,146,148,149,152,153,154,],[49,49,49,49,-22,49,49,49,49,-21,-23,49,-33,49,49,49,49,49,49,49,49,49,49,49,49,49,-35,49,49,49,49,49,-25,-26,-34,49,49,49,49,49,49,49,49,49,-30,-32,49,49,-31,]),'MINUS':([31,35,37,38,39,40,45,47,48,49,50,54,55,56,57,59,60,64,65,66,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,88,89,90,91,93,94,95,96,97,98,102,103,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,122,123,124,125,126,127,132,133,134,135,136,138,139,140,141,142,143,144,145,146,147,148,149,150,152,153,154,],[50,50,-28,50,50,-22,82,50,-63,50,50,-54,-55,-56,-57,-59,-60,50,82,-63,-21,-23,50,-33,50,50,50,50,50,50,50,50,50,50,50,50,50,82,-35,50,50,-36,-37,50,50,50,-58,-51,-25,-26,82,82,82,82,82,82,82,-47,-48,-49,-50,82,82,82,-34,82,-62,82,-27,82,82,82,-61,50,-38,-39,-40,50,50,50,82,50,50,50,50,50,-67,-30,-32,-66,50,50,-31,]),'INT':([31,35,38,39,40,47,49,50,64,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,89,90,91,95,96,97,103,104,119,133,138,139,140,142,143,144,145,146,148,149,152,153,154,],[51,51,51,51,-22,51,51,51,51,-21,-23,51,-33,51,51,51,51,51,51,51,51,51,51,51,51,51,-35,51,51,51,51,51,-25,-26,-34,51,51,51,51,51,51,51,51,51,-30,-32,51,51,-31,]),'STR':([31,35,38,39,40,47,49,50,64,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,89,90,91,95,96,97,103,104,119,133,138,139,140,142,143,144,145,146,148,149,152,153,154,],[52,52,52,52,-22,52,52,52,52,-21,-23,52,-33,52,52,52,52,52,52,52,52,52,52,52,52,52,-35,52,52,52,52,52,-25,-26,-34,52,52,52,52,52,52,52,52,52,-30,-32,52,52,-31,]),'BOOL':([31,35,38,39,40,47,49,50,64,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,89,90,91,95,96,97,103,104,119,133,138,139,140,142,143,144,145,146,148,149,152,153,154,],[53,53,53,53,-22,53,53,53,53,-21,-23,53,-33,53,53,53,53,53,53,53,53,53,53,53,53,53,-35,53,53,53,53,53,-25,-26,-34,53,53,53,53,53,53,53,53,53,-30,-32,53,53,-31,]),'NUMBER':([31,35,38,39,40,47,49,50,64,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,89,90,91,95,96,97,103,104,119,133,138,139,140,142,143,144,145,146,148,149,152,153,154,],[54,54,54,54,-22,54,54,54,54,-21,-23,54,-33,54,54,54,54,54,54,54,54,54,54,54,54,54,-35,54,54,54,54,54,-25,-26,-34,54,54,54,54,54,54,54,54,54,-30,-32,54,54,-31,]),'TRUE':([31,35,38,39,40,47,49,50,64,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,89,90,91,95,96,97,103,104,119,133,138,139,140,142,143,144,145,146,148,149,152,153,154,],[55,55,55,55,-22,55,55,55,55,-21,-23,55,-33,55,55,55,55,55,55,55,55,55,55,55,55,55,-35,55,55,55,55,55,-25,-26,-34,55,55,55,55,55,55,55,55,55,-30,-32,55,55,-31,]),'FALSE':([31,35,38,39,40,47,49,50,64,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,89,90,91,95,96,97,103,104,119,133,138,139,140,142,143,144,145,146,148,149,152,153,154,],[56,56,56,56,-22,56,56,56,56,-21,-23,56,-33,56,56,56,56,56,56,56,56,56,56,56,56,56,-35,56,56,56,56,56,-25,-26,-34,56,56,56,56,56,56,56,56,56,-30,-32,56,56,-31,]),'STRING':([31,35,38,39,40,47,49,50,64,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,89,90,91,95,96,97,103,104,119,133,138,139,140,142,143,144,145,146,148,149,152,153,154,],[57,57,57,57,-22,57,57,57,57,-21,-23,57,-33,57,57,57,57,57,57,57,57,57,57,57,57,57,-35,57,57,57,57,57,-25,-26,-34,57,57,57,57,57,57,57,57,57,-30,-32,57,57,-31,]),'CLOSURE':([31,35,38,39,40,47,49,50,64,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,89,90,91,95,96,97,103,104,119,133,138,139,140,142,143,144,145,146,148,149,152,153,154,],[58,58,58,58,-22,58,58,58,58,-21,-23,58,-33,58,58,58,58,58,58,58,58,58,58,58,58,58,-35,58,58,58,58,58,-25,-26,-34,58,58,58,58,58,58,58,58,58,-30,-32,58,58,-31,]),'AT':([31,35,38,39,40,47,49,50,64,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,89,90,91,95,96,97,103,104,119,133,138,139,140,142,143,144,145,146,148,149,152,153,154,],[59,59,59,59,-22,59,59,59,59,-21,-23,59,-33,59,59,59,59,59,59,59,59,59,59,59,59,59,-35,59,59,59,59,59,-25,-26,-34,59,59,59,59,59,59,59,59,59,-30,-32,59,59,-31,]),'NIL':([31,35,38,39,40,47,49,50,64,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,89,90,91,95,96,97,103,104,119,133,138,139,140,142,143,144,145,146,148,149,152,153,154,],[60,60,60,60,-22,60,60,60,60,-21,-23,60,-33,60,60,60,60,60,60,60,60,60,60,60,60,60,-35,60,60,60,60,60,-25,-26,-34,60,60,60,60,60,60,60,60,60,-30,-32,60,60,-31,]),'LAMBDA':([31,35,38,39,40,47,49,50,64,68,69,73,74,75,76,77,78,79,80,81,82,83,84,85,86,87,89,90,91,95,96,97,103,104,119,133,138,139,140,142,143,144,145,146,148,149,152,153,154,],[61,61,61,61,-22,61,61,61,61,-21,-23,61,-33,61,61,61,61,61,61,61,61,61,61,61,61,61,-35,61,61,61,61,61,-25,-26,-34,61,61,61,61,61,61,61,61,61,-30,-32,61,61,-31,]),'ASSIGN':([37,48,124,],[-28,90,-27,]),'DOT':([37,48,66,124,],[-28,92,92,-27,]),'EQ':([37,45,48,54,55,56,57,59,60,65,66,88,93,94,98,102,105,106,107,108,109,110,111,112,113,114,115,116,117,118,120,122,123,124,125,126,127,132,134,135,136,141,147,150,],[-28,75,-63,-54,-55,-56,-57,-59,-60,75,-63,75,-36,-37,-58,-51,75,-41,-42,-43,-44,-45,-46,-47,-48,-49,-50,75,75,75,75,-62,75,-27,75,75,75,-61,-38,-39,-40,75,-67,-66,]),'GREATER':([37,45,48,54,55,56,57,59,60,65,66,88,93,94,98,102,105,106,107,108,109,110,111,112,113,114,115,116,117,118,120,122,123,124,125,126,127,132,134,135,136,141,147,150,],[-28,76,-63,-54,-55,-56,-57,-59,-60,76,-63,76,-36,-37,-58,-51,76,-41,-42,-43,-44,-45,-46,-47,-48,-49,-50,76,76,76,76,-62,76,-27,76,76,76,-61,-38,-39,-40,76,-67,-66,]),'LESS':([37,45,48,54,55,56,57,59,60,65,66,88,93,94,98,102,105,106,107,108,109,110,111,112,113,114,115,116,117,118,120,122,123,124,125,126,127,132,134,135,136,141,147,150,],[-28,77,-63,-54,-55,-56,-57,-59,-60,77,-63,77,-36,-37,-58,-51,77,-41,-42,-43,-44,-45,-46,-47,-48,-49,-50,77,77,77,77,-62,77,-27,77,77,77,-61,-38,-39,-40,77,-67,-66,]),'NOT_EQ':([37,45,48,54,55,56,57,59,60,65,66,88,93,94,98,102,105,106,107,108,109,110,111,112,113,114,115,116,117,118,120,122,123,124,125,126,127,132,134,135,136,141,147,150,],[-28,78,-63,-54,-55,-56,-57,-59,-60,78,-63,78,-36,-37,-58,-51,78,-41,-42,-43,-44,-45,-46,-47,-48,-49,-50,78,78,78,78,-62,78,-27,78,78,78,-61,-38,-39,-40,78,-67,-66,]),'GREATER_EQ':([37,45,48,54,55,56,57,59,60,65,66,88,93,94,98,102,105,106,107,108,109,110,111,112,113,114,115,116,117,118,120,122,123,124,125,126,127,132,134,135,136,141,147,150,],[-28,79,-63,-54,-55,-56,-57,-59,-60,79,-63,79,-36,-37,-58,-51,79,-41,-42,-43,-44,-45,-46,-47,-48,-49,-50,79,79,79,79,-62,79,-27,79,79,79,-61,-38,-39,-40,79,-67,-66,]),'LESS_EQ':([37,45,48,54,55,56,57,59,60,65,66,88,93,94,98,102,105,106,107,108,109,110,111,112,113,114,115,116,117,118,120,122,123,124,125,126,127,132,134,135,136,141,147,150,],[-28,80,-63,-54,-55,-56,-57,-59,-60,80,-63,80,-36,-37,-58,-51,80,-41,-42,-43,-44,-45,-46,-47,-48,-49,-50,80,80,80,80,-62,80,-27,80,80,80,-61,-38,-39,-40,80,-67,-66,]),'PLUS':([37,45,48,54,55,56,57,59,60,65,66,88,93,94,98,102,105,106,107,108,109,110,111,112,113,114,115,116,117,118,120,122,123,124,125,126,127,132,134,135,136,141,147,150,],[-28,81,-63,-54,-55,-56,-57,-59,-60,81,-63,81,-36,-37,-58,-51,81,81,81,81,81,81,81,-47,-48,-49,-50,81,81,81,81,-62,81,-27,81,81,81,-61,-38,-39,-40,81,-67,-66,]),'MULTIPLY':([37,45,48,54,55,56,57,59,60,65,66,88,93,94,98,102,105,106,107,108,109,110,111,112,113,114,115,116,117,118,120,122,123,124,125,126,127,132,134,135,136,141,147,150,],[-28,83,-63,-54,-55,-56,-57,-59,-60,83,-63,83,-36,-37,-58,-51,83,83,83,83,83,83,83,83,83,-49,-50,83,83,83,83,-62,83,-27,83,83,83,-61,-38,-39,-40,83,-67,-66,]),'DIVIDE':([37,45,48,54,55,56,57,59,60,65,66,88,93,94,98,102,105,106,107,108,109,110,111,112,113,114,115,116,117,118,120,122,123,124,125,126,127,132,134,135,136,141,147,150,],[-28,84,-63,-54,-55,-56,-57,-59,-60,84,-63,84,-36,-37,-58,-51,84,84,84,84,84,84,84,84,84,-49,-50,84,84,84,84,-62,84,-27,84,84,84,-61,-38,-39,-40,84,-67,-66,]),'OR':([37,45,48,54,55,56,57,59,60,65,66,88,93,94,98,102,105,106,107,108,109,110,111,112,113,114,115,116,117,118,120,122,123,124,125,126,127,132,134,135,136,141,147,150,],[-28,85,-63,-54,-55,-56,-57,-59,-60,85,-63,85,-36,-37,-58,-51,85,-41,-42,-43,-44,-45,-46,-47,-48,-49,-50,-52,-53,85,85,-62,85,-27,85,85,85,-61,-38,-39,-40,85,-67,-66,]),'AND':([37,45,48,54,55,56,57,59,60,65,66,88,93,94,98,102,105,106,107,108,109,110,111,112,113,114,115,116,117,118,120,122,123,124,125,126,127,132,134,135,136,141,147,150,],[-28,86,-63,-54,-55,-56,-57,-59,-60,86,-63,86,-36,-37,-58,-51,86,-41,-42,-43,-44,-45,-46,-47,-48,-49,-50,86,-53,86,86,-62,86,-27,86,86,86,-61,-38,-39,-40,86,-67,-66,]),'ELSE':([148,],[151,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'program':([0,],[1,]),'interfaces':([0,],[2,]),'funcs':([0,2,],[3,8,]),'interface':([0,2,],[4,9,]),'func':([0,2,3,8,],[5,5,10,10,]),'fields':([13,],[16,]),'field':([13,16,],[17,28,]),'field_function':([13,16,],[18,18,]),'field_variable':([13,16,],[19,19,]),'formal_args':([14,25,99,],[21,33,128,]),'formal_arg':([14,25,30,99,],[23,23,36,23,]),'statements':([31,35,138,139,140,142,152,],[39,64,143,144,145,146,153,]),'statement':([31,35,39,64,138,139,140,142,143,144,145,146,152,153,],[40,40,68,68,40,40,40,40,68,68,68,68,40,68,]),'assign':([31,35,39,64,138,139,140,142,143,144,145,146,152,153,],[41,41,41,41,41,41,41,41,41,41,41,41,41,41,]),'expression':([31,35,38,39,47,49,50,64,73,75,76,77,78,79,80,81,82,83,84,85,86,87,90,91,95,96,97,133,138,139,140,142,143,144,145,146,152,153,],[45,45,65,45,88,93,94,45,105,106,107,108,109,110,111,112,113,114,115,116,117,118,120,123,125,126,127,141,45,45,45,45,45,45,45,45,45,45,]),'qualified_name':([31,35,38,39,47,49,50,64,73,75,76,77,78,79,80,81,82,83,84,85,86,87,90,91,95,96,97,133,138,139,140,142,143,144,145,146,152,153,],[48,48,66,48,66,66,66,48,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,66,48,48,48,48,48,48,48,48,48,48,]),'qualified_name_no_dot':([42,43,],[70,72,]),'args':([91,],[121,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> program","S'",1,None,None,None),
+  ('program -> interfaces funcs','program',2,'p_program','brewparse.py',27),
+  ('program -> funcs','program',1,'p_program','brewparse.py',28),
+  ('interfaces -> interfaces interface','interfaces',2,'p_interfaces','brewparse.py',35),
+  ('interfaces -> interface','interfaces',1,'p_interfaces','brewparse.py',36),
+  ('interface -> INTERFACE NAME LBRACE fields RBRACE','interface',5,'p_interface','brewparse.py',40),
+  ('fields -> fields field','fields',2,'p_fields','brewparse.py',44),
+  ('fields -> field','fields',1,'p_fields','brewparse.py',45),
+  ('field -> field_function','field',1,'p_field','brewparse.py',49),
+  ('field -> field_variable','field',1,'p_field','brewparse.py',50),
+  ('field_function -> NAME LPAREN formal_args RPAREN SEMI','field_function',5,'p_field_function','brewparse.py',54),
+  ('field_function -> NAME LPAREN RPAREN SEMI','field_function',4,'p_field_function','brewparse.py',55),
+  ('field_variable -> NAME SEMI','field_variable',2,'p_field_variable','brewparse.py',62),
+  ('funcs -> funcs func','funcs',2,'p_funcs','brewparse.py',67),
+  ('funcs -> func','funcs',1,'p_funcs','brewparse.py',68),
+  ('func -> DEF NAME LPAREN formal_args RPAREN LBRACE statements RBRACE','func',8,'p_func','brewparse.py',72),
+  ('func -> DEF NAME LPAREN RPAREN LBRACE statements RBRACE','func',7,'p_func','brewparse.py',73),
+  ('formal_args -> formal_args COMMA formal_arg','formal_args',3,'p_formal_args','brewparse.py',80),
+  ('formal_args -> formal_arg','formal_args',1,'p_formal_args','brewparse.py',81),
+  ('formal_arg -> NAME','formal_arg',1,'p_formal_arg','brewparse.py',85),
+  ('formal_arg -> AMP NAME','formal_arg',2,'p_formal_arg','brewparse.py',86),
+  ('statements -> statements statement','statements',2,'p_statements','brewparse.py',93),
+  ('statements -> statement','statements',1,'p_statements','brewparse.py',94),
+  ('statement -> assign SEMI','statement',2,'p_statement___assign','brewparse.py',99),
+  ('assign -> qualified_name ASSIGN expression','assign',3,'p_assign','brewparse.py',103),
+  ('statement -> VAR qualified_name_no_dot SEMI','statement',3,'p_statement___fvar','brewparse.py',107),
+  ('statement -> BVAR qualified_name_no_dot SEMI','statement',3,'p_statement___bvar','brewparse.py',111),
+  ('qualified_name -> qualified_name DOT NAME','qualified_name',3,'p_qualified_name','brewparse.py',115),
+  ('qualified_name -> NAME','qualified_name',1,'p_qualified_name','brewparse.py',116),
+  ('qualified_name_no_dot -> NAME','qualified_name_no_dot',1,'p_qualified_name_no_dot','brewparse.py',123),
+  ('statement -> IF LPAREN expression RPAREN LBRACE statements RBRACE','statement',7,'p_statement_if','brewparse.py',127),
+  ('statement -> IF LPAREN expression RPAREN LBRACE statements RBRACE ELSE LBRACE statements RBRACE','statement',11,'p_statement_if','brewparse.py',128),
+  ('statement -> WHILE LPAREN expression RPAREN LBRACE statements RBRACE','statement',7,'p_statement_while','brewparse.py',146),
+  ('statement -> expression SEMI','statement',2,'p_statement_expr','brewparse.py',151),
+  ('statement -> RETURN expression SEMI','statement',3,'p_statement_return','brewparse.py',156),
+  ('statement -> RETURN SEMI','statement',2,'p_statement_return','brewparse.py',157),
+  ('expression -> NOT expression','expression',2,'p_expression_not','brewparse.py',166),
+  ('expression -> MINUS expression','expression',2,'p_expression_uminus','brewparse.py',171),
+  ('expression -> INT LPAREN expression RPAREN','expression',4,'p_expression_int','brewparse.py',176),
+  ('expression -> STR LPAREN expression RPAREN','expression',4,'p_expression_string','brewparse.py',180),
+  ('expression -> BOOL LPAREN expression RPAREN','expression',4,'p_expression_bool','brewparse.py',184),
+  ('expression -> expression EQ expression','expression',3,'p_arith_expression_binop','brewparse.py',188),
+  ('expression -> expression GREATER expression','expression',3,'p_arith_expression_binop','brewparse.py',189),
+  ('expression -> expression LESS expression','expression',3,'p_arith_expression_binop','brewparse.py',190),
+  ('expression -> expression NOT_EQ expression','expression',3,'p_arith_expression_binop','brewparse.py',191),
+  ('expression -> expression GREATER_EQ expression','expression',3,'p_arith_expression_binop','brewparse.py',192),
+  ('expression -> expression LESS_EQ expression','expression',3,'p_arith_expression_binop','brewparse.py',193),
+  ('expression -> expression PLUS expression','expression',3,'p_arith_expression_binop','brewparse.py',194),
+  ('expression -> expression MINUS expression','expression',3,'p_arith_expression_binop','brewparse.py',195),
+  ('expression -> expression MULTIPLY expression','expression',3,'p_arith_expression_binop','brewparse.py',196),
+  ('expression -> expression DIVIDE expression','expression',3,'p_arith_expression_binop','brewparse.py',197),
+  ('expression -> LPAREN expression RPAREN','expression',3,'p_expression_group','brewparse.py',202),
+  ('expression -> expression OR expression','expression',3,'p_expression_and_or','brewparse.py',207),
+  ('expression -> expression AND expression','expression',3,'p_expression_and_or','brewparse.py',208),
+  ('expression -> NUMBER','expression',1,'p_expression_number','brewparse.py',213),
+  ('expression -> TRUE','expression',1,'p_expression_bool_literal','brewparse.py',218),
+  ('expression -> FALSE','expression',1,'p_expression_bool_literal','brewparse.py',219),
+  ('expression -> STRING','expression',1,'p_expression_string_literal','brewparse.py',225),
+  ('expression -> CLOSURE NAME','expression',2,'p_expression_closure','brewparse.py',230),
+  ('expression -> AT','expression',1,'p_expression_empty_obj','brewparse.py',234),
+  ('expression -> NIL','expression',1,'p_expression_nil','brewparse.py',238),
+  ('expression -> qualified_name LPAREN args RPAREN','expression',4,'p_func_call','brewparse.py',242),
+  ('expression -> qualified_name LPAREN RPAREN','expression',3,'p_func_call','brewparse.py',243),
+  ('expression -> qualified_name','expression',1,'p_expression_variable','brewparse.py',251),
+  ('args -> args COMMA expression','args',3,'p_expression_args','brewparse.py',256),
+  ('args -> expression','args',1,'p_expression_args','brewparse.py',257),
+  ('expression -> LAMBDA LPAREN formal_args RPAREN LBRACE statements RBRACE','expression',7,'p_expression_lambda','brewparse.py',262),
+  ('expression -> LAMBDA LPAREN RPAREN LBRACE statements RBRACE','expression',6,'p_expression_lambda','brewparse.py',263),
+]